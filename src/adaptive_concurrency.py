@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency: AIMD In-Flight Limit
+Grows the number of concurrent API requests while the provider stays healthy
+and halves it on 429s, timeouts or a p95 latency above target
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests
+    
+    Each successful request adds 1/limit to the limit (about +1 per round of
+    requests) as long as the recent error rate and p95 latency are within
+    target. Overload signals multiply the limit by `backoff`, at most once per
+    typical request latency so one burst of 429s counts as a single cut.
+    """
+    
+    def __init__(self, initial_limit: int = 5, min_limit: int = 1, max_limit: int = 50,
+                 latency_target: float = 10.0, error_target: float = 0.05,
+                 backoff: float = 0.5, window: int = 50):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target  # Seconds, compared with rolling p95
+        self.error_target = error_target      # Failure fraction that pauses growth
+        self.backoff = backoff
+        
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)  # True = success
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop = None
+    
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+    
+    def _get_condition(self) -> asyncio.Condition:
+        # Conditions belong to one event loop; rebuild for a new one
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+    
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()"""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+        return time.monotonic()
+    
+    async def release(self, started: float, success: bool):
+        """Free a slot and feed its latency and outcome into the controller"""
+        self.latencies.append(time.monotonic() - started)
+        self.outcomes.append(success)
+        
+        p95 = self.p95_latency()
+        if p95 is not None and p95 > self.latency_target:
+            if self.record_overload():
+                self.latencies.clear()  # Judge the reduced limit on fresh samples
+        elif success and self.error_rate() <= self.error_target and self.limit < self.max_limit:
+            previous = self.current_limit
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if self.current_limit > previous:
+                self.increases += 1
+        
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+    
+    def record_overload(self) -> bool:
+        """Cut the limit after a 429, timeout or latency spike (False if cooling down)"""
+        now = time.monotonic()
+        if now - self.last_decrease < self._cooldown():
+            return False
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self.last_decrease = now
+        self.decreases += 1
+        return True
+    
+    def _cooldown(self) -> float:
+        # Roughly one request round-trip: requests already in flight when the
+        # limit was cut report the same congestion and should not cut again
+        if not self.latencies:
+            return 1.0
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2]
+    
+    def p95_latency(self) -> Optional[float]:
+        if len(self.latencies) < 10:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+    
+    def get_stats(self) -> Dict:
+        p95 = self.p95_latency()
+        return {
+            'current_limit': self.current_limit,
+            'in_flight': self.in_flight,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+            'error_rate': round(self.error_rate() * 100, 1)
+        }
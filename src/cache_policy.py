@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Cache Policy: W-TinyLFU Admission and Eviction
+A small LRU window in front of a segmented LRU main region, with a
+count-min frequency sketch deciding which entries are worth keeping
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List
+
+import numpy as np
+
+
+class FrequencySketch:
+    """Count-min sketch of recent access frequency (4 rows, counters capped at 15)
+    
+    After `sample_size` increments every counter is halved, so the sketch
+    reflects recent popularity rather than all-time counts.
+    """
+    
+    def __init__(self, capacity: int, depth: int = 4):
+        self.width = 1 << max(4, (max(capacity, 1) * 4 - 1).bit_length())
+        self.depth = depth
+        self.table = np.zeros((depth, self.width), dtype=np.uint8)
+        self.rows = np.arange(depth)
+        self.sample_size = 10 * max(capacity, 1)
+        self.additions = 0
+    
+    def _columns(self, key: Hashable) -> np.ndarray:
+        digest = key[-1] if isinstance(key, tuple) and isinstance(key[-1], bytes) else repr(key).encode('utf-8')
+        if len(digest) < 4 * self.depth:
+            digest = hashlib.blake2b(digest, digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest[:4 * self.depth], dtype=np.uint32) & np.uint32(self.width - 1)
+    
+    def increment(self, key: Hashable):
+        columns = self._columns(key)
+        counters = self.table[self.rows, columns]
+        # Conservative update: only the smallest counters grow
+        grow = (counters == counters.min()) & (counters < 15)
+        self.table[self.rows[grow], columns[grow]] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.table >>= 1
+            self.additions //= 2
+    
+    def frequency(self, key: Hashable) -> int:
+        return int(self.table[self.rows, self._columns(key)].min())
+
+
+class WTinyLFU:
+    """W-TinyLFU eviction over hashable keys, O(1) per operation
+    
+    New keys enter a window LRU (`window_share` of capacity). A key leaving
+    the window competes with the main region's eviction victim and is only
+    admitted if the sketch has seen it more often, so one-off keys cannot
+    flush out popular ones. The main region is a segmented LRU: a hit in
+    probation promotes to protected (`protected_share` of main), whose
+    overflow falls back to probation.
+    
+    Keys whose last element is a blake2b digest (like the cache keys in
+    main.SemanticCache) are hashed for free; others go through repr().
+    """
+    
+    def __init__(self, capacity: int, window_share: float = 0.01, protected_share: float = 0.8):
+        self.capacity = max(capacity, 1)
+        self.window_size = max(1, int(self.capacity * window_share))
+        self.main_size = max(self.capacity - self.window_size, 1)
+        self.protected_size = max(1, int(self.main_size * protected_share))
+        self.window: OrderedDict = OrderedDict()
+        self.probation: OrderedDict = OrderedDict()
+        self.protected: OrderedDict = OrderedDict()
+        self.sketch = FrequencySketch(self.capacity)
+        self.rejected = 0
+    
+    def __len__(self) -> int:
+        return len(self.window) + len(self.probation) + len(self.protected)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.window or key in self.probation or key in self.protected
+    
+    def record(self, key: Hashable):
+        """Count one access (hit or miss) towards the key's popularity"""
+        self.sketch.increment(key)
+    
+    def touch(self, key: Hashable):
+        """Mark a cached key as just used"""
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+    
+    def add(self, key: Hashable) -> List[Hashable]:
+        """Insert a new key; returns the keys that must leave the cache (the victim or the rejected candidate)"""
+        self.window[key] = None
+        if len(self.window) <= self.window_size:
+            return []
+        
+        candidate, _ = self.window.popitem(last=False)
+        if len(self.probation) + len(self.protected) < self.main_size:
+            self.probation[candidate] = None
+            return []
+        
+        segment = self.probation if self.probation else self.protected
+        victim = next(iter(segment))
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del segment[victim]
+            self.probation[candidate] = None
+            return [victim]
+        self.rejected += 1
+        return [candidate]
+    
+    def remove(self, key: Hashable):
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                return
+    
+    def get_stats(self) -> Dict:
+        return {
+            'window': len(self.window),
+            'probation': len(self.probation),
+            'protected': len(self.protected),
+            'rejected': self.rejected
+        }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Conversation Context: Stable Cacheable Prompt Prefixes
+Every request is a fixed per-category prefix (system prompt plus optional
+few-shot examples) followed by the current review, under a token budget
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from token_counter import TokenCounter, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY
+
+
+class ConversationContextManager:
+    """Builds prompts as a byte-identical per-category prefix + one user turn
+    
+    Nothing from earlier requests is carried forward, so prompt size stays
+    flat while the repeated prefix is what provider-side prompt caching can
+    reuse. If a prompt would exceed max_prompt_tokens, the few-shot examples
+    are dropped first (the system-only prefix is just as stable), then the
+    user turn is truncated.
+    """
+    
+    def __init__(self, token_counter: TokenCounter, max_prompt_tokens: int = 1500,
+                 system_prompts: Optional[Dict[str, str]] = None,
+                 default_system_prompt: str = "You are an expert at analyzing {category} product reviews.",
+                 few_shot_examples: Optional[Dict[str, List[Dict[str, str]]]] = None):
+        self.token_counter = token_counter
+        self.max_prompt_tokens = max_prompt_tokens
+        self.system_prompts = system_prompts or {}
+        self.default_system_prompt = default_system_prompt
+        self.few_shot_examples = few_shot_examples or {}  # category -> [{"user": ..., "assistant": ...}]
+        
+        # category -> (prefix messages, prefix tokens); built once, never mutated
+        self.prefixes: Dict[str, Tuple[List[Dict], int]] = {}
+        self.system_prefixes: Dict[str, Tuple[List[Dict], int]] = {}
+        
+        self.requests = 0
+        self.prefix_reuses = 0
+        self.prompt_tokens = 0
+        self.reused_prefix_tokens = 0
+        self.truncated = 0
+        self.examples_dropped = 0
+        self.prefix_requests: Dict[Tuple[str, int], int] = {}  # (category, prefix messages) -> requests
+    
+    def system_prompt(self, category: str) -> str:
+        if category in self.system_prompts:
+            return self.system_prompts[category]
+        # Plain replace: prompts may contain literal JSON braces
+        return self.default_system_prompt.replace("{category}", category.lower())
+    
+    def _prefix(self, category: str, with_examples: bool) -> Tuple[List[Dict], int]:
+        cache = self.prefixes if with_examples else self.system_prefixes
+        if category not in cache:
+            messages = [{"role": "system", "content": self.system_prompt(category)}]
+            if with_examples:
+                for example in self.few_shot_examples.get(category, []):
+                    messages.append({"role": "user", "content": example['user']})
+                    messages.append({"role": "assistant", "content": example['assistant']})
+            cache[category] = (messages, sum(self.token_counter.message_tokens(m) for m in messages))
+        return cache[category]
+    
+    def build_messages(self, category: str, user_prompt: str) -> Tuple[List[Dict], bool]:
+        """Prefix + user turn within the token budget, and whether the prefix was sent before"""
+        prefix, prefix_tokens = self._prefix(category, with_examples=True)
+        user_message = {"role": "user", "content": user_prompt}
+        # Budget covers the whole billed prompt, chat-format overhead included
+        user_tokens = self.token_counter.message_tokens(user_message) + TOKENS_PER_REPLY
+        
+        if prefix_tokens + user_tokens > self.max_prompt_tokens and len(prefix) > 1:
+            prefix, prefix_tokens = self._prefix(category, with_examples=False)
+            self.examples_dropped += 1
+        
+        if prefix_tokens + user_tokens > self.max_prompt_tokens:
+            excess = prefix_tokens + user_tokens - self.max_prompt_tokens
+            encoding = self.token_counter.encoding
+            content_tokens = encoding.encode_ordinary(user_prompt)
+            user_message = {"role": "user", "content": encoding.decode(content_tokens[:max(0, len(content_tokens) - excess)])}
+            user_tokens = self.token_counter.message_tokens(user_message) + TOKENS_PER_REPLY
+            self.truncated += 1
+        
+        # Reuse is tracked per exact prefix, so a system-only fallback counts separately
+        prefix_key = (category, len(prefix))
+        reused = self.prefix_requests.get(prefix_key, 0) > 0
+        self.prefix_requests[prefix_key] = self.prefix_requests.get(prefix_key, 0) + 1
+        
+        self.requests += 1
+        self.prompt_tokens += prefix_tokens + user_tokens
+        if reused:
+            self.prefix_reuses += 1
+            self.reused_prefix_tokens += prefix_tokens
+        
+        return prefix + [user_message], reused
+    
+    def project_prompt_tokens(self, categories: Sequence[str], user_prompts: Sequence[str]) -> np.ndarray:
+        """Billed prompt tokens per (category, user prompt), as build_messages would send them
+        
+        User prompts go through one TokenCounter.count_batch call (threaded,
+        repeats encoded once); prefix sizes are looked up once per category.
+        Nothing is counted as a request. Truncated prompts are projected at
+        the budget.
+        """
+        user_tokens = self.token_counter.count_batch(user_prompts) + (
+            TOKENS_PER_MESSAGE + self.token_counter.count("user") + TOKENS_PER_REPLY
+        )
+        names, codes = np.unique(np.asarray(categories, dtype=object), return_inverse=True)
+        full = np.array([self._prefix(name, with_examples=True)[1] for name in names], dtype=np.int64)[codes]
+        system = np.array([self._prefix(name, with_examples=False)[1] for name in names], dtype=np.int64)[codes]
+        
+        # Same fallbacks as build_messages: drop the examples first, then truncate the review turn
+        prefix_tokens = np.where(full + user_tokens > self.max_prompt_tokens, system, full)
+        return np.minimum(prefix_tokens + user_tokens, self.max_prompt_tokens)
+    
+    def get_stats(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'prefix_reuse_rate': round(self.prefix_reuses / self.requests * 100, 1) if self.requests else 0.0,
+            'reused_token_share': round(self.reused_prefix_tokens / self.prompt_tokens * 100, 1) if self.prompt_tokens else 0.0,
+            'avg_prompt_tokens': round(self.prompt_tokens / self.requests, 1) if self.requests else 0.0,
+            'examples_dropped': self.examples_dropped,
+            'truncated': self.truncated
+        }
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Learned Router: Data-Fitted Tier Selection
+Trains a small softmax model on SmartRouterV2 features and recorded outcomes
+"""
+
+import json
+import argparse
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from smart_router_v2 import SmartRouterV2, ComplexityScore, ReviewFeatures, TIER_NAMES
+
+# Model inputs, in artifact column order
+FEATURE_NAMES = (
+    'technical', 'sentiment', 'length', 'domain', 'final', 'log_words',
+    'is_electronics', 'is_books', 'is_home_and_garden'
+)
+CATEGORY_FEATURES = ('Electronics', 'Books', 'Home_and_Garden')
+
+ARTIFACT_VERSION = 1
+DEFAULT_MODEL_PATH = "config/learned_router.json"
+
+
+def build_features(technical, sentiment, length, domain, final, word_counts,
+                   categories: Sequence[str]) -> np.ndarray:
+    """Stack router sub-scores, size and category into an (n, features) matrix"""
+    columns = [
+        np.asarray(technical, dtype=np.float64),
+        np.asarray(sentiment, dtype=np.float64),
+        np.asarray(length, dtype=np.float64),
+        np.asarray(domain, dtype=np.float64),
+        np.asarray(final, dtype=np.float64),
+        np.log1p(np.asarray(word_counts, dtype=np.float64))
+    ]
+    categories = list(categories)
+    for name in CATEGORY_FEATURES:
+        columns.append(np.array([category == name for category in categories], dtype=np.float64))
+    return np.column_stack(columns)
+
+
+class LearnedRouter(SmartRouterV2):
+    """SmartRouterV2 whose tier choice comes from a trained softmax model
+    
+    Sub-scores are still computed by the heuristic analyzers and reported
+    unchanged; only recommended_tier is replaced. Inference is one small
+    matrix product in NumPy per review (or per batch), and cached decisions
+    carry the learned tier.
+    
+    Opt-in only: nothing constructs it by default. Week 1 records one
+    attempt per review (the tier it routed to), so a model trained on those
+    outcomes mostly relearns the heuristic thresholds; it is worth using
+    only once outcomes include attempts on other tiers and its accuracy
+    beats the heuristic's (see the artifact's `training` section).
+    """
+    
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.model_path = model_path
+        
+        with open(model_path, 'r') as f:
+            artifact = json.load(f)
+        
+        if artifact.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported learned router artifact version: {artifact.get('version')}")
+        if tuple(artifact['feature_names']) != FEATURE_NAMES:
+            raise ValueError("Learned router artifact was trained on different features")
+        
+        self.feature_mean = np.asarray(artifact['mean'], dtype=np.float64)
+        self.feature_scale = np.asarray(artifact['scale'], dtype=np.float64)
+        self.weights = np.asarray(artifact['weights'], dtype=np.float64)
+        self.bias = np.asarray(artifact['bias'], dtype=np.float64)
+        self.tier_codes = np.array([TIER_NAMES.index(tier) for tier in artifact['tiers']], dtype=np.uint8)
+        self.training_info = artifact.get('training', {})
+    
+    def predict_tier_codes(self, features: np.ndarray) -> np.ndarray:
+        """Tier code per feature row"""
+        logits = ((features - self.feature_mean) / self.feature_scale) @ self.weights + self.bias
+        return self.tier_codes[np.argmax(logits, axis=1)]
+    
+    def score_features(self, features: ReviewFeatures) -> ComplexityScore:
+        """Heuristic sub-scores with a learned tier recommendation"""
+        score = super().score_features(features)
+        row = build_features(
+            [score.technical_score], [score.sentiment_score], [score.length_score],
+            [score.domain_score], [score.final_score], [features.word_count], [features.category]
+        )
+        tier = TIER_NAMES[self.predict_tier_codes(row)[0]]
+        return replace(score, recommended_tier=tier)
+    
+    def select_tier_codes(self, technical, sentiment, length, domain, final, word_counts,
+                          categories: Sequence[str]) -> np.ndarray:
+        """Learned tier code per batch row"""
+        return self.predict_tier_codes(
+            build_features(technical, sentiment, length, domain, final, word_counts, categories)
+        )
+    
+    def _worker_init_kwargs(self) -> Dict:
+        kwargs = super()._worker_init_kwargs()
+        kwargs['model_path'] = self.model_path
+        return kwargs
+
+
+def load_outcomes(path: str) -> List[Dict]:
+    """Read recorded routing outcomes (one JSON object per line)
+    
+    Each record needs review_text, category, tier, acceptable (bool) and
+    latency (seconds), as written by the Week 1 pipeline.
+    """
+    outcomes = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                outcomes.append(json.loads(line))
+    return outcomes
+
+
+def label_outcomes(outcomes: List[Dict], max_latency: Optional[float] = None) -> List[Tuple[str, str, str]]:
+    """Reduce outcomes to one (text, category, target tier) per review
+    
+    The target is the cheapest tier that gave an acceptable answer within
+    max_latency. Reviews where no attempt qualified are labelled with the
+    tier above the most capable one tried, since every tier tried fell short.
+    With a single attempt per review, an acceptable answer can never point
+    to a cheaper tier than the one tried.
+    """
+    attempts = defaultdict(list)
+    for outcome in outcomes:
+        attempts[(outcome['review_text'], outcome['category'])].append(outcome)
+    
+    labelled = []
+    for (text, category), tried in attempts.items():
+        good = [
+            TIER_NAMES.index(o['tier']) for o in tried
+            if o['acceptable'] and (max_latency is None or o['latency'] <= max_latency)
+        ]
+        if good:
+            target = min(good)
+        else:
+            target = min(max(TIER_NAMES.index(o['tier']) for o in tried) + 1, len(TIER_NAMES) - 1)
+        labelled.append((text, category, TIER_NAMES[target]))
+    return labelled
+
+
+def train_softmax(features: np.ndarray, labels: np.ndarray, classes: int,
+                  epochs: int = 500, learning_rate: float = 0.5,
+                  l2: float = 1e-3) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Full-batch gradient descent for multinomial logistic regression"""
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = (features - mean) / scale
+    
+    n, d = x.shape
+    weights = np.zeros((d, classes))
+    bias = np.zeros(classes)
+    targets = np.eye(classes)[labels]
+    
+    for _ in range(epochs):
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        
+        error = (probs - targets) / n
+        weights -= learning_rate * (x.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    
+    return mean, scale, weights, bias
+
+
+def train_learned_router(outcomes_path: str, output_path: str = DEFAULT_MODEL_PATH,
+                         max_latency: Optional[float] = None, epochs: int = 500) -> Dict:
+    """Fit a LearnedRouter artifact from recorded outcomes and write it as JSON"""
+    outcomes = load_outcomes(outcomes_path)
+    labelled = label_outcomes(outcomes, max_latency)
+    if not labelled:
+        raise ValueError(f"No outcomes found in {outcomes_path}")
+    
+    # Reviews tried on one tier only: their labels can only confirm or raise that tier
+    tiers_tried = defaultdict(set)
+    for outcome in outcomes:
+        tiers_tried[(outcome['review_text'], outcome['category'])].add(outcome['tier'])
+    single_attempt = sum(len(tried) == 1 for tried in tiers_tried.values())
+    
+    router = SmartRouterV2()
+    texts = [text for text, _, _ in labelled]
+    categories = [category for _, category, _ in labelled]
+    batch = router.route_reviews_batch(texts, categories)
+    features = build_features(
+        batch.technical_scores, batch.sentiment_scores, batch.length_scores,
+        batch.domain_scores, batch.final_scores, batch.word_counts, categories
+    )
+    
+    # Only tiers that appear as targets become model classes
+    tiers = sorted({tier for _, _, tier in labelled}, key=TIER_NAMES.index)
+    labels = np.array([tiers.index(tier) for _, _, tier in labelled])
+    mean, scale, weights, bias = train_softmax(features, labels, len(tiers), epochs=epochs)
+    
+    logits = ((features - mean) / scale) @ weights + bias
+    accuracy = float((np.argmax(logits, axis=1) == labels).mean())
+    heuristic_accuracy = float(np.mean([
+        TIER_NAMES[code] == tier for code, (_, _, tier) in zip(batch.tier_codes.tolist(), labelled)
+    ]))
+    
+    artifact = {
+        'version': ARTIFACT_VERSION,
+        'feature_names': list(FEATURE_NAMES),
+        'tiers': tiers,
+        'mean': mean.tolist(),
+        'scale': scale.tolist(),
+        'weights': weights.tolist(),
+        'bias': bias.tolist(),
+        'training': {
+            'samples': len(labelled),
+            'max_latency': max_latency,
+            'train_accuracy': round(accuracy, 4),
+            'heuristic_accuracy': round(heuristic_accuracy, 4),
+            'single_attempt_rate': round(single_attempt / len(labelled), 4)
+        }
+    }
+    
+    with open(output_path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    
+    return artifact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the learned router from recorded outcomes")
+    parser.add_argument("outcomes", help="JSONL file of routing outcomes")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="Artifact path to write")
+    parser.add_argument("--max-latency", type=float, default=None,
+                        help="Seconds above which an acceptable answer still counts as a miss")
+    parser.add_argument("--epochs", type=int, default=500)
+    args = parser.parse_args()
+    
+    print("🧠 Training Learned Router...")
+    artifact = train_learned_router(args.outcomes, args.output, args.max_latency, args.epochs)
+    training = artifact['training']
+    print(f"✅ Trained on {training['samples']} reviews → {args.output}")
+    print(f"Tiers: {', '.join(artifact['tiers'])}")
+    print(f"Train accuracy: {training['train_accuracy'] * 100:.1f}% "
+          f"(heuristic thresholds: {training['heuristic_accuracy'] * 100:.1f}%)")
+    if training['single_attempt_rate'] > 0.5:
+        print(f"⚠️ {training['single_attempt_rate'] * 100:.0f}% of reviews were tried on one tier only; "
+              f"labels cannot show where a cheaper tier would have done")
+    if training['train_accuracy'] <= training['heuristic_accuracy']:
+        print("⚠️ No better than the heuristic thresholds; keep SmartRouterV2 (LearnedRouter is opt-in)")
@@ -10,11 +10,17 @@ import time
 import json
 import hashlib
 import asyncio
+from copy import deepcopy
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
 import random
 
+import numpy as np
+
+from semantic_index import HashedNgramEmbedder, IVFIndex, polarity_cues
+from cache_policy import WTinyLFU
+
 # For real dataset integration
 try:
     from datasets import load_dataset
@@ -389,29 +395,154 @@ class ModelRouter:
         return self.model_costs.get(model, 1.0) / 1_000_000
 
 class SemanticCache:
-    """Cache similar analysis results"""
+    """Cache analysis results for similar reviews
+    
+    Each entry is keyed on a blake2b digest of its category and full
+    normalized text, so an exact repeat hits without embedding. Other
+    reviews are embedded locally (hashed character n-grams) and searched in
+    a per-category IVF index; a lookup hits when the nearest cached review's
+    cosine similarity reaches the category's threshold and both reviews use
+    the same negation and sentiment terms (semantic_index.polarity_cues), so
+    "would not recommend" never reuses "would recommend". The check is
+    lexical: sarcasm or a verdict reworded without those terms can still
+    match a review that means the opposite.
     
-    def __init__(self, max_size: int = 1000):
-        self.cache = {}
+    Past max_size, W-TinyLFU (cache_policy.WTinyLFU) decides what stays:
+    one-off reviews cannot push out frequently hit ones. A category's index
+    is rebuilt once it holds more evicted vectors than live ones. Results
+    are copied on the way in and out, so callers may mutate what they get.
+    """
+    
+    def __init__(self, max_size: int = 1000, similarity_threshold: float = 0.8,
+                 category_thresholds: Optional[Dict[str, float]] = None,
+                 embedder: Optional[HashedNgramEmbedder] = None):
         self.max_size = max_size
-        
-    def _get_cache_key(self, review_text: str, category: str) -> str:
-        content = review_text.lower().strip()[:100]
-        key_string = f"{category}_{content}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        self.similarity_threshold = similarity_threshold
+        self.category_thresholds = category_thresholds or {}
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.policy = WTinyLFU(max_size)
+        self.indexes: Dict[str, IVFIndex] = {}
+        self.ids: Dict[Tuple[str, bytes], int] = {}  # Cache key -> entry id
+        self.results: Dict[int, Tuple[Tuple[str, bytes], ProductReviewResult]] = {}
+        self.cues: Dict[int, int] = {}  # Entry id -> polarity_cues mask
+        self.dead: Dict[str, int] = defaultdict(int)  # Evicted vectors still in each category index
+        self.next_id = 0
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.evictions: Dict[str, int] = defaultdict(int)
+        self.polarity_mismatches = 0  # Misses where a similar entry was rejected for its cues
+        self._last_embedding = (None, None)  # set() usually follows a miss on the same text
+    
+    @staticmethod
+    def make_key(review_text: str, category: str) -> Tuple[str, bytes]:
+        normalized = ' '.join(review_text.lower().split())
+        digest = hashlib.blake2b(normalized.encode('utf-8', 'surrogatepass'), digest_size=16,
+                                 person=category.encode('utf-8')[:16])
+        return category, digest.digest()
+    
+    def threshold(self, category: str) -> float:
+        return self.category_thresholds.get(category, self.similarity_threshold)
+    
+    def _embed(self, review_text: str) -> np.ndarray:
+        text, vector = self._last_embedding
+        if text is not review_text:
+            vector = self.embedder.embed(review_text)
+            self._last_embedding = (review_text, vector)
+        return vector
     
     def get(self, review_text: str, category: str) -> Optional[ProductReviewResult]:
-        cache_key = self._get_cache_key(review_text, category)
-        return self.cache.get(cache_key)
+        key = self.make_key(review_text, category)
+        self.policy.record(key)
+        entry_id = self.ids.get(key)
+        
+        index = self.indexes.get(category)
+        if entry_id is None and index is not None and index.size:
+            threshold = self.threshold(category)
+            cues = None  # Computed once a candidate is similar enough
+            mismatched = False
+            ids, scores = index.search(self._embed(review_text))
+            for candidate, score in zip(ids, scores):
+                if score < threshold:
+                    break
+                candidate = int(candidate)
+                if candidate not in self.results:  # Skip vectors of evicted entries
+                    continue
+                if cues is None:
+                    cues = polarity_cues(review_text)
+                if self.cues[candidate] != cues:
+                    mismatched = True
+                    continue
+                entry_id = candidate
+                break
+            self.polarity_mismatches += mismatched and entry_id is None
+        
+        if entry_id is None:
+            self.misses[category] += 1
+            return None
+        
+        entry_key, result = self.results[entry_id]
+        if entry_key != key:
+            self.policy.record(entry_key)  # Credit the entry that answered
+        self.policy.touch(entry_key)
+        self.hits[category] += 1
+        return deepcopy(result)
     
     def set(self, review_text: str, category: str, result: ProductReviewResult):
-        if len(self.cache) >= self.max_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-        
-        cache_key = self._get_cache_key(review_text, category)
-        self.cache[cache_key] = result
+        key = self.make_key(review_text, category)
+        if key in self.ids:
+            self.results[self.ids[key]] = (key, deepcopy(result))
+            self.policy.touch(key)
+            return
+        
+        if category not in self.indexes:
+            self.indexes[category] = IVFIndex(self.embedder.dim)
+        entry_id = self.next_id
+        self.next_id += 1
+        self.indexes[category].add(self._embed(review_text), entry_id)
+        self.ids[key] = entry_id
+        self.results[entry_id] = (key, deepcopy(result))
+        self.cues[entry_id] = polarity_cues(review_text)
+        for evicted in self.policy.add(key):
+            self._remove(evicted)
+    
+    def _remove(self, key: Tuple[str, bytes]):
+        category = key[0]
+        entry_id = self.ids.pop(key)
+        del self.results[entry_id]
+        del self.cues[entry_id]
+        self.evictions[category] += 1
+        self.dead[category] += 1
+        index = self.indexes[category]
+        if self.dead[category] > index.size - self.dead[category]:
+            index.rebuild(np.fromiter(
+                (entry_id for entry_id, (entry_key, _) in self.results.items() if entry_key[0] == category),
+                dtype=np.int64
+            ))
+            self.dead[category] = 0
+    
+    def get_stats(self) -> Dict:
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        categories = {}
+        for category in sorted(set(self.hits) | set(self.misses) | set(self.evictions)):
+            category_lookups = self.hits[category] + self.misses[category]
+            categories[category] = {
+                'hits': self.hits[category],
+                'misses': self.misses[category],
+                'evictions': self.evictions[category],
+                'hit_rate': round(self.hits[category] / category_lookups * 100, 1) if category_lookups > 0 else 0.0
+            }
+        return {
+            'size': len(self.results),
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': round(hits / lookups * 100, 1) if lookups > 0 else 0.0,
+            'evictions': sum(self.evictions.values()),
+            'polarity_mismatches': self.polarity_mismatches,
+            'similarity_threshold': self.similarity_threshold,
+            'policy': self.policy.get_stats(),
+            'categories': categories
+        }
 
 class AmazonReviewAnalyzer:
     """Main analyzer with optimizations"""
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Mock OpenRouter: Local Chat Completions Server for Load Testing
+Serves /api/v1/chat/completions for every model in settings.yaml with
+configurable latency, generation speed, 429/5xx injection and streaming
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional
+
+import yaml
+from aiohttp import web
+
+from token_counter import TokenCounter
+
+# Sentiment cues for synthetic answers (deterministic per review text)
+POSITIVE_WORDS = ('great', 'love', 'excellent', 'perfect', 'amazing', 'recommend', 'good', 'best')
+NEGATIVE_WORDS = ('terrible', 'awful', 'broke', 'waste', 'disappointed', 'poor', 'bad', 'worst', 'return')
+PACKED_MARKER = "Reviews (one JSON object per line):\n"
+
+
+@dataclass
+class ModelProfile:
+    """Simulated behaviour of one model"""
+    latency_median: float = 0.3   # Seconds to first token (lognormal median)
+    latency_sigma: float = 0.5    # Lognormal shape; larger = heavier tail
+    tokens_per_sec: float = 80.0  # Generation speed after the first token
+    error_rate_429: float = 0.0   # Fraction of requests rejected as rate limited
+    error_rate_5xx: float = 0.0   # Fraction of requests failing with 500/502/503
+    streaming: bool = True        # Accept stream=True requests
+    
+    def first_token_delay(self, rng: random.Random) -> float:
+        return rng.lognormvariate(0.0, self.latency_sigma) * self.latency_median if self.latency_median > 0 else 0.0
+
+
+def load_profiles(config: Dict) -> Dict[str, ModelProfile]:
+    """ModelProfile per OpenRouter model name, from the mock_server section
+    
+    `mock_server.defaults` applies to every model under `models`;
+    `mock_server.models.<tier>` overrides it for one tier.
+    """
+    mock_config = config.get('mock_server', {})
+    known = {field.name for field in fields(ModelProfile)}
+    defaults = {key: value for key, value in (mock_config.get('defaults') or {}).items() if key in known}
+    
+    profiles = {}
+    for tier, model in config['models'].items():
+        overrides = {key: value for key, value in ((mock_config.get('models') or {}).get(tier) or {}).items() if key in known}
+        profiles[model['openrouter_name']] = ModelProfile(**{**defaults, **overrides})
+    return profiles
+
+
+def _sentiment(text: str) -> str:
+    lowered = text.lower()
+    positive = sum(word in lowered for word in POSITIVE_WORDS)
+    negative = sum(word in lowered for word in NEGATIVE_WORDS)
+    if positive > negative:
+        return 'Positive'
+    if negative > positive:
+        return 'Negative'
+    return 'Neutral'
+
+
+def _answer(text: str) -> Dict:
+    sentiment = _sentiment(text)
+    return {
+        'sentiment': sentiment,
+        'quality': {'Positive': 'Good', 'Negative': 'Poor', 'Neutral': 'Fair'}[sentiment],
+        'recommendation': {'Positive': 'Recommend', 'Negative': 'Not Recommend', 'Neutral': 'Neutral'}[sentiment],
+        'insights': [text[:60]]
+    }
+
+
+def synthesize_content(messages: List[Dict]) -> str:
+    """JSON answer for the last user turn (a JSON array for packed prompts)"""
+    prompt = messages[-1]['content'] if messages else ''
+    if PACKED_MARKER in prompt:
+        answers = []
+        for line in prompt.split(PACKED_MARKER, 1)[1].splitlines():
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            answers.append({'review_id': item.get('review_id'), **_answer(item.get('text', ''))})
+        return json.dumps(answers)
+    return json.dumps(_answer(prompt))
+
+
+class MockOpenRouter:
+    """aiohttp app answering chat completions with simulated timing and failures"""
+    
+    def __init__(self, profiles: Dict[str, ModelProfile], token_counter: TokenCounter, seed: Optional[int] = None):
+        self.profiles = profiles
+        self.token_counter = token_counter
+        self.rng = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self.injected: Dict[str, int] = {'429': 0, '5xx': 0}
+        self.streams_cancelled = 0
+        self.started = time.monotonic()
+    
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v1/chat/completions', self.chat_completions)
+        app.router.add_get('/api/v1/models', self.list_models)
+        app.router.add_get('/stats', self.stats)
+        return app
+    
+    @staticmethod
+    def _error(status: int, message: str, headers: Optional[Dict] = None) -> web.Response:
+        return web.json_response({'error': {'message': message, 'code': status}}, status=status, headers=headers)
+    
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get('model')
+        profile = self.profiles.get(model)
+        if profile is None:
+            return self._error(400, f"{model} is not a valid model ID")
+        self.requests[model] = self.requests.get(model, 0) + 1
+        
+        # Failures are decided up front and returned without generation delay
+        roll = self.rng.random()
+        if roll < profile.error_rate_429:
+            self.injected['429'] += 1
+            return self._error(429, "Rate limit exceeded (injected)", headers={'Retry-After': '1'})
+        if roll < profile.error_rate_429 + profile.error_rate_5xx:
+            self.injected['5xx'] += 1
+            return self._error(self.rng.choice((500, 502, 503)), "Upstream error (injected)")
+        
+        messages = body.get('messages', [])
+        content = synthesize_content(messages)
+        max_tokens = body.get('max_tokens') or 4096
+        completion_tokens = self.token_counter.count(content)
+        if completion_tokens > max_tokens:
+            # Cut at max_tokens like a real model would (approximate character cut)
+            content = content[:len(content) * max_tokens // completion_tokens]
+            completion_tokens = max_tokens
+        usage = {
+            'prompt_tokens': self.token_counter.count_messages(messages),
+            'completion_tokens': completion_tokens
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        finish_reason = 'length' if completion_tokens == max_tokens else 'stop'
+        
+        await asyncio.sleep(profile.first_token_delay(self.rng))
+        if body.get('stream') and profile.streaming:
+            return await self._stream(request, body, profile, content, usage, finish_reason)
+        
+        await asyncio.sleep(completion_tokens / profile.tokens_per_sec)
+        return web.json_response({
+            'id': f"gen-mock-{sum(self.requests.values())}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': finish_reason
+            }],
+            'usage': usage
+        })
+    
+    async def _stream(self, request: web.Request, body: Dict, profile: ModelProfile,
+                      content: str, usage: Dict, finish_reason: str) -> web.StreamResponse:
+        """Server-sent chunks paced at the profile's tokens/sec"""
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        chunk_base = {'id': f"gen-mock-{sum(self.requests.values())}", 'object': 'chat.completion.chunk',
+                      'created': int(time.time()), 'model': body['model']}
+        
+        async def send(payload: Dict):
+            await response.write(f"data: {json.dumps({**chunk_base, **payload})}\n\n".encode())
+        
+        try:
+            for piece in re.findall(r'\S+\s*', content):
+                await send({'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]})
+                await asyncio.sleep(self.token_counter.count(piece) / profile.tokens_per_sec)
+            await send({'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]})
+            if (body.get('stream_options') or {}).get('include_usage'):
+                await send({'choices': [], 'usage': usage})
+            await response.write(b"data: [DONE]\n\n")
+        except ConnectionResetError:
+            # Client closed the stream early (e.g. early stop); nothing left to send
+            self.streams_cancelled += 1
+        except asyncio.CancelledError:
+            # Handler cancelled with the connection (aiohttp does this on disconnect)
+            self.streams_cancelled += 1
+            raise
+        return response
+    
+    async def list_models(self, request: web.Request) -> web.Response:
+        return web.json_response({'data': [{'id': model} for model in self.profiles]})
+    
+    async def stats(self, request: web.Request) -> web.Response:
+        elapsed = time.monotonic() - self.started
+        total = sum(self.requests.values())
+        return web.json_response({
+            'requests': total,
+            'requests_per_sec': round(total / elapsed, 1) if elapsed > 0 else 0.0,
+            'per_model': self.requests,
+            'injected_errors': self.injected,
+            'streams_cancelled': self.streams_cancelled
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenRouter-compatible server for offline load tests")
+    parser.add_argument("--config", default="config/settings.yaml")
+    parser.add_argument("--host", default=None, help="Overrides mock_server.host")
+    parser.add_argument("--port", type=int, default=None, help="Overrides mock_server.port")
+    parser.add_argument("--seed", type=int, default=None, help="Seed latency and error injection")
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    mock_config = config.get('mock_server', {})
+    host = args.host or mock_config.get('host', '127.0.0.1')
+    port = args.port or mock_config.get('port', 8765)
+    
+    server = MockOpenRouter(load_profiles(config), TokenCounter(), seed=args.seed)
+    print(f"🧪 Mock OpenRouter serving {len(server.profiles)} models at http://{host}:{port}/api/v1")
+    print(f"   Point the optimizer at it with OPENROUTER_BASE_URL=http://{host}:{port}/api/v1")
+    web.run_app(server.create_app(), host=host, port=port, access_log=None, print=None)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Collapsing: Streaming MinHash-LSH
+Finds reviews that are near-copies of one already seen (templated seller
+text, pasted complaints) so only one representative is routed and billed
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from semantic_index import polarity_cues
+
+_ROLL = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+# splitmix64 finaliser constants (one seeded bijection per MinHash permutation)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+@dataclass
+class DuplicateMatch:
+    """A review matched to an earlier representative"""
+    representative: int   # Entry key of the representative
+    similarity: float     # Estimated Jaccard similarity of their shingle sets
+
+
+class NearDuplicateIndex:
+    """Streaming MinHash-LSH index of representative reviews
+    
+    Each review becomes a `num_perm` MinHash signature over character
+    shingles; signatures are split into `bands` LSH bands and bucketed per
+    group (category), so only reviews sharing a whole band are compared.
+    A candidate whose estimated Jaccard similarity reaches `threshold` and
+    whose negation/sentiment terms match (semantic_index.polarity_cues, so
+    "would not recommend" never copies "would recommend") makes the review
+    a duplicate; otherwise it becomes a new representative.
+    
+    Only signatures (in a NumPy ring) and one 64-bit bucket key per band are
+    kept (plus a cue mask), never review text, and at most
+    `max_representatives` of them (oldest dropped first): about 2 KB per
+    representative at the defaults, however long the stream.
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, max_representatives: int = 100_000, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_representatives = max_representatives
+        
+        rng = np.random.default_rng(seed)
+        # Per-permutation seeds XORed into each shingle hash before mixing
+        self.seeds = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        # Odd multipliers folding a band's rows into one bucket key
+        self.band_weights = rng.integers(0, 1 << 63, size=self.rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        
+        # Representative keys are sequential: key k lives in ring row k % max_representatives
+        self.signatures = np.empty((min(max_representatives, 1024), num_perm), dtype=np.uint32)
+        self.groups = np.empty(len(self.signatures), dtype=np.uint64)
+        self.cues = np.empty(len(self.signatures), dtype=np.uint64)  # polarity_cues mask per row
+        self.buckets: Dict[int, Union[int, List[int]]] = {}
+        self.payloads: Dict[int, Any] = {}
+        self.next_key = 0
+        self.size = 0
+        
+        self.seen = 0
+        self.duplicates = 0
+        self.comparisons = 0
+        self.evicted = 0
+        self.polarity_mismatches = 0  # Reviews kept apart only by differing cues
+    
+    def _shingles(self, text: str) -> np.ndarray:
+        """Distinct 64-bit hashes of the text's character shingles"""
+        data = np.frombuffer(' '.join(text.lower().split()).encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        n = min(self.shingle_size, max(len(data), 1))
+        count = max(len(data) - n + 1, 1)
+        hashes = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over='ignore'):  # uint64 hashing wraps by design
+            for offset in range(min(n, len(data))):
+                hashes = hashes * _ROLL + data[offset:offset + count]
+            hashes *= _MIX
+        return np.unique(hashes)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values)"""
+        mixed = self.seeds ^ self._shingles(text)
+        with np.errstate(over='ignore'):
+            mixed = (mixed ^ (mixed >> np.uint64(30))) * _MIX1
+            mixed = (mixed ^ (mixed >> np.uint64(27))) * _MIX2
+            mixed ^= mixed >> np.uint64(31)
+        return (mixed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+    
+    def _bucket_keys(self, signature: np.ndarray, group_hash: np.uint64) -> List[int]:
+        """One 62-bit key per band, distinct across bands and groups"""
+        bands = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        with np.errstate(over='ignore'):
+            keys = (bands * self.band_weights).sum(axis=1) + np.arange(self.bands, dtype=np.uint64) * _MIX
+            keys = (keys ^ group_hash) * _MIX1
+        return (keys >> np.uint64(2)).tolist()
+    
+    @staticmethod
+    def _group_hash(group: str) -> np.uint64:
+        return np.frombuffer(hashlib.blake2b(group.encode('utf-8'), digest_size=8).digest(), dtype=np.uint64)[0]
+    
+    def add(self, text: str, group: str = "") -> Tuple[int, Optional[DuplicateMatch]]:
+        """Match a review against earlier representatives of its group
+        
+        Returns (key, match). A duplicate gets its representative's key and
+        the match; a new representative gets a fresh key and None.
+        """
+        self.seen += 1
+        signature = self.signature(text)
+        group_hash = self._group_hash(group)
+        cues = np.uint64(polarity_cues(text))
+        bucket_keys = self._bucket_keys(signature, group_hash)
+        
+        candidates = set()
+        for bucket_key in bucket_keys:
+            members = self.buckets.get(bucket_key)
+            if members is not None:
+                candidates.update(members if isinstance(members, list) else (members,))
+        
+        best: Optional[DuplicateMatch] = None
+        if candidates:
+            self.comparisons += len(candidates)
+            keys = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            rows = keys % self.max_representatives
+            # Band-key collisions across groups are possible; the stored group rules them out
+            similarity = np.where(self.groups[rows] == group_hash,
+                                  (self.signatures[rows] == signature).mean(axis=1), 0.0)
+            similar = similarity >= self.threshold
+            similarity[self.cues[rows] != cues] = 0.0
+            top = int(np.argmax(similarity))
+            if similarity[top] >= self.threshold:
+                best = DuplicateMatch(int(keys[top]), float(similarity[top]))
+            elif similar.any():
+                self.polarity_mismatches += 1
+        
+        if best is not None:
+            self.duplicates += 1
+            return best.representative, best
+        
+        if self.size == self.max_representatives:
+            self._evict_oldest()
+        key = self.next_key
+        self.next_key += 1
+        self.size += 1
+        row = key % self.max_representatives
+        if row >= len(self.signatures):
+            self._grow()
+        self.signatures[row] = signature
+        self.groups[row] = group_hash
+        self.cues[row] = cues
+        for bucket_key in bucket_keys:
+            members = self.buckets.get(bucket_key)
+            if members is None:
+                self.buckets[bucket_key] = key  # Most buckets hold a single key; no list needed
+            elif isinstance(members, list):
+                members.append(key)
+            else:
+                self.buckets[bucket_key] = [members, key]
+        return key, None
+    
+    def _grow(self):
+        capacity = min(2 * len(self.signatures), self.max_representatives)
+        signatures = np.empty((capacity, self.num_perm), dtype=np.uint32)
+        signatures[:len(self.signatures)] = self.signatures
+        groups = np.empty(capacity, dtype=np.uint64)
+        groups[:len(self.groups)] = self.groups
+        cues = np.empty(capacity, dtype=np.uint64)
+        cues[:len(self.cues)] = self.cues
+        self.signatures, self.groups, self.cues = signatures, groups, cues
+    
+    def _evict_oldest(self):
+        key = self.next_key - self.size
+        row = key % self.max_representatives
+        for bucket_key in self._bucket_keys(self.signatures[row], self.groups[row]):
+            members = self.buckets[bucket_key]
+            if isinstance(members, list):
+                members.remove(key)
+                if len(members) == 1:
+                    self.buckets[bucket_key] = members[0]
+            else:
+                del self.buckets[bucket_key]
+        self.payloads.pop(key, None)
+        self.size -= 1
+        self.evicted += 1
+    
+    def __contains__(self, key: int) -> bool:
+        return self.next_key - self.size <= key < self.next_key
+    
+    def attach(self, key: int, payload: Any):
+        """Store a representative's result for fan-out to later duplicates"""
+        if key in self:
+            self.payloads[key] = payload
+    
+    def payload(self, key: int) -> Optional[Any]:
+        return self.payloads.get(key)
+    
+    def get_stats(self) -> Dict:
+        return {
+            'seen': self.seen,
+            'duplicates': self.duplicates,
+            'duplicate_rate': round(self.duplicates / self.seen * 100, 1) if self.seen else 0.0,
+            'representatives': self.size,
+            'evicted': self.evicted,
+            'polarity_mismatches': self.polarity_mismatches,
+            'comparisons_per_review': round(self.comparisons / self.seen, 2) if self.seen else 0.0
+        }
@@ -4,13 +4,35 @@ Implements real API calls with cost optimization
 """
 
 import os
+import json
 import time
 import asyncio
 import yaml
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from openai import OpenAI
-import tiktoken
+import httpx
+from openai import APITimeoutError, AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
+from smart_router_v2 import LatencyTracker
+from adaptive_concurrency import AdaptiveConcurrencyLimiter
+from rate_limiter import ModelRateLimiter
+from conversation_context import ConversationContextManager
+from token_counter import TokenCounter, get_encoding
+from streaming import StreamMetrics, stream_completion
+from response_cache import ResponseCache
+from near_duplicates import DuplicateMatch, NearDuplicateIndex
+from singleflight import SingleFlight
+
+
+# Task instructions shared by every single-review prompt, kept in the system
+# prompt so the per-request user turn carries only the review
+REVIEW_ANALYSIS_INSTRUCTIONS = """Analyze each product review for:
+1. Sentiment (Positive/Negative/Neutral)
+2. Product Quality Assessment
+3. Purchase Recommendation
+4. Key Insights
+
+Respond in JSON format:
+{"sentiment": "", "quality": "", "recommendation": "", "insights": []}"""
 
 
 @dataclass
@@ -29,9 +51,19 @@ class OpenRouterOptimizer:
         self.config = self._load_config(config_path)
         self.openrouter_config = self._setup_openrouter()
         self.client = self._create_client()
-        self.conversation_cache = {}  # For KV cache optimization
-        self.token_encoder = tiktoken.get_encoding("cl100k_base")
-        
+        self.token_encoder = get_encoding("cl100k_base")  # Shared process-wide
+        self.token_counter = TokenCounter(encoding=self.token_encoder)  # Cached per-text / per-message counts
+        self.context_manager = self._create_context_manager(  # Stable per-category prompt prefixes
+            "You are an expert at analyzing {category} product reviews.\n\n" + REVIEW_ANALYSIS_INSTRUCTIONS
+        )
+        self.latency_tracker: Optional[LatencyTracker] = None  # Per-tier latency feed for routing
+        self.concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None  # AIMD slots around API calls
+        self.rate_limiter = ModelRateLimiter(self.config['models'])  # Per-tier RPM/TPM buckets
+        self.stream_metrics = StreamMetrics()  # Per-model TTFT and tokens/sec
+        self.response_cache = self._create_response_cache()  # Survives reruns and crashes
+        self.singleflight = SingleFlight()  # Identical requests in flight share one API call
+        self.deduplicator = self._create_deduplicator()  # Collapses near-duplicate reviews in batches
+    
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
         with open(config_path, 'r') as f:
@@ -45,19 +77,39 @@ class OpenRouterOptimizer:
         
         return OpenRouterConfig(
             api_key=api_key,
+            base_url=os.getenv('OPENROUTER_BASE_URL', OpenRouterConfig.base_url),  # e.g. mock_openrouter.py
             max_budget=float(os.getenv('MAX_BUDGET', '5.00'))
         )
     
-    def _create_client(self) -> OpenAI:
-        """Create OpenRouter client using OpenAI SDK"""
-        return OpenAI(
+    def _create_client(self) -> AsyncOpenAI:
+        """Create async OpenRouter client over a pooled keep-alive HTTP transport"""
+        pool = self.config.get('http', {})
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=pool.get('max_connections', 200),
+                max_keepalive_connections=pool.get('max_keepalive_connections', 50),
+                keepalive_expiry=pool.get('keepalive_expiry', 30.0)
+            ),
+            timeout=httpx.Timeout(pool.get('timeout', 60.0))
+        )
+        return AsyncOpenAI(
             base_url=self.openrouter_config.base_url,
             api_key=self.openrouter_config.api_key,
+            http_client=http_client
         )
     
+    async def aclose(self):
+        """Close pooled connections from the loop that used them
+        
+        Pooled connections belong to one event loop, so a fresh client is
+        created for the next loop (e.g. another batch_analyze_reviews call).
+        """
+        await self.client.close()
+        self.client = self._create_client()
+    
     def _count_tokens(self, text: str) -> int:
         """Count tokens in text"""
-        return len(self.token_encoder.encode(text))
+        return self.token_counter.count(text)
     
     def _estimate_cost(self, model_config: Dict, prompt_tokens: int, completion_tokens: int = 50) -> float:
         """Estimate API call cost"""
@@ -77,32 +129,168 @@ class OpenRouterOptimizer:
         """Get model configuration by tier"""
         return self.config['models'][model_tier]
     
-    def _create_optimized_prompt(self, review_text: str, category: str, use_conversation: bool = True) -> List[Dict]:
-        """Create optimized prompt for API call"""
-        base_prompt = f"""Analyze this {category.lower()} product review for:
-1. Sentiment (Positive/Negative/Neutral)
-2. Product Quality Assessment
-3. Purchase Recommendation
-4. Key Insights
-
-Review: "{review_text}"
-
-Respond in JSON format:
-{{"sentiment": "", "quality": "", "recommendation": "", "insights": []}}"""
-
-        if use_conversation and category in self.conversation_cache:
-            # Reuse conversation context (KV cache optimization)
-            messages = self.conversation_cache[category] + [
-                {"role": "user", "content": f"Analyze: {review_text}"}
-            ]
-        else:
-            # New conversation
-            messages = [
-                {"role": "system", "content": f"You are an expert at analyzing {category.lower()} product reviews."},
-                {"role": "user", "content": base_prompt}
-            ]
+    def _create_context_manager(self, default_system_prompt: str,
+                                system_prompts: Optional[Dict[str, str]] = None) -> ConversationContextManager:
+        """Prompt prefix builder using the token budget and few-shot examples in settings.yaml"""
+        context = self.config.get('context', {})
+        return ConversationContextManager(
+            self.token_counter,
+            max_prompt_tokens=context.get('max_prompt_tokens', 1500),
+            system_prompts=system_prompts,
+            default_system_prompt=default_system_prompt,
+            few_shot_examples=context.get('few_shot_examples') or {}
+        )
+    
+    def _create_optimized_prompt(self, review_text: str, category: str) -> Tuple[List[Dict], bool]:
+        """Create prompt as the category's cached prefix plus this review alone
+        
+        Returns the messages and whether the prefix was already sent before.
+        """
+        return self.context_manager.build_messages(category, f'Review: "{review_text}"')
+    
+    def _streaming_config(self) -> Dict:
+        """Streaming settings with defaults (processing.streaming in settings.yaml)"""
+        streaming = {
+            'enabled': True,
+            'early_stop_fields': ['sentiment', 'quality', 'recommendation']
+        }
+        streaming.update(self.config.get('processing', {}).get('streaming') or {})
+        return streaming
+    
+    def _create_response_cache(self) -> Optional[ResponseCache]:
+        """On-disk exact-match response cache (response_cache in settings.yaml)"""
+        settings = self.config.get('response_cache', {})
+        if not settings.get('enabled', True):
+            return None
+        return ResponseCache(
+            path=settings.get('path', 'data/response_cache.sqlite'),
+            max_entries=settings.get('max_entries', 100_000)
+        )
+    
+    def _create_deduplicator(self) -> Optional[NearDuplicateIndex]:
+        """MinHash-LSH near-duplicate index (processing.dedup in settings.yaml)"""
+        settings = self.config.get('processing', {}).get('dedup') or {}
+        if not settings.get('enabled', True):
+            return None
+        return NearDuplicateIndex(
+            threshold=settings.get('threshold', 0.8),
+            num_perm=settings.get('num_perm', 128),
+            bands=settings.get('bands', 16),
+            shingle_size=settings.get('shingle_size', 5),
+            max_representatives=settings.get('max_representatives', 100_000)
+        )
+    
+    async def _complete(self, model_tier: str, messages: List[Dict], max_tokens: int,
+                        prompt_tokens: int, early_stop: bool = False, stream: Optional[bool] = None) -> Dict:
+        """One chat completion for a tier: response cache, rate limits, then the API
+        
+        Streams when enabled in settings (`stream` overrides). With
+        `early_stop`, the stream closes once processing.streaming's
+        early_stop_fields are complete; only callers that need nothing
+        beyond those fields should ask for it. A request identical to one
+        already in flight (same response cache key, from any caller) waits
+        for it instead of calling the API again.
+        Returns the content, billed tokens (0 for a cache hit or a coalesced
+        request), whether it was cached or coalesced, the call latency and,
+        when streamed, time to first token, tokens/sec and whether
+        generation was cut short.
+        """
+        model_name = self._get_model_config(model_tier)['openrouter_name']
+        temperature = 0.1
+        streaming = self._streaming_config()
+        streamed = streaming['enabled'] if stream is None else stream
+        # Early-stopped answers are cached apart from full ones
+        stop_fields = tuple(streaming['early_stop_fields']) if streamed and early_stop else ()
+        
+        if self.response_cache is not None:
+            cached = self.response_cache.get(model_name, messages, max_tokens, temperature, stop_fields)
+            if cached is not None:
+                return {
+                    'content': cached['content'],
+                    'tokens_used': 0,
+                    'cached': True,
+                    'latency': 0.0,
+                    'time_to_first_token': None,
+                    'tokens_per_sec': None,
+                    'stopped_early': False,
+                    'coalesced': False
+                }
         
-        return messages
+        key = ResponseCache.make_key(model_name, messages, max_tokens, temperature, stop_fields)
+        completion, shared = await self.singleflight.do(key, lambda: self._request(
+            model_tier, model_name, messages, max_tokens, temperature, prompt_tokens, streamed, stop_fields
+        ))
+        if shared:
+            return {**completion, 'tokens_used': 0, 'coalesced': True}  # Billed to the first caller
+        return completion
+    
+    async def _request(self, model_tier: str, model_name: str, messages: List[Dict], max_tokens: int,
+                       temperature: float, prompt_tokens: int, streamed: bool,
+                       stop_fields: Tuple[str, ...]) -> Dict:
+        """The API call behind _complete: rate limits, request, then the response cache
+        
+        With a concurrency limiter attached, only the HTTP call itself holds
+        a slot and feeds its latency sample, so rate-limit waits, retries and
+        cache hits never read as server congestion.
+        """
+        # Reserve rate-limit capacity for the prompt plus the largest completion
+        reserved_tokens = prompt_tokens + max_tokens
+        await self.rate_limiter.acquire(model_tier, reserved_tokens)
+        
+        limiter = self.concurrency_limiter
+        slot_started = await limiter.acquire() if limiter is not None else None
+        used_tokens = 0  # A failed call gives back its whole reservation
+        succeeded = False
+        try:
+            api_start = time.time()
+            if not streamed:
+                response = await self.client.chat.completions.create(
+                    model=model_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                completion = {
+                    'content': response.choices[0].message.content or '',
+                    'tokens_used': response.usage.total_tokens if response.usage else reserved_tokens,
+                    'time_to_first_token': None,
+                    'tokens_per_sec': None,
+                    'stopped_early': False
+                }
+            else:
+                result = await stream_completion(
+                    self.client, model_name, messages, max_tokens, temperature=temperature,
+                    required_fields=stop_fields, count_tokens=self._count_tokens
+                )
+                self.stream_metrics.record(model_name, result)
+                completion = {
+                    'content': result.content,
+                    'tokens_used': result.total_tokens or prompt_tokens + result.completion_tokens,
+                    'time_to_first_token': result.time_to_first_token,
+                    'tokens_per_sec': result.tokens_per_sec,
+                    'stopped_early': result.stopped_early
+                }
+            used_tokens = completion['tokens_used']
+            succeeded = True
+        except (RateLimitError, APITimeoutError, asyncio.CancelledError):
+            # 429s, HTTP timeouts and callers' timeouts firing mid-call all mean overload
+            if limiter is not None:
+                limiter.record_overload()
+            raise
+        finally:
+            self.rate_limiter.settle(model_tier, reserved_tokens, used_tokens)
+            if limiter is not None:
+                await limiter.release(slot_started, success=succeeded)
+        completion['latency'] = time.time() - api_start
+        completion['cached'] = False
+        completion['coalesced'] = False
+        
+        if self.latency_tracker is not None:
+            self.latency_tracker.record(model_tier, completion['latency'])
+        if self.response_cache is not None:
+            self.response_cache.set(model_name, messages, max_tokens, temperature,
+                                    completion['content'], completion['tokens_used'], stop_fields)
+        return completion
     
     async def analyze_review_real(self, review_data: Dict, model_tier: str = "ultra_lightweight") -> Dict:
         """Make real API call to analyze review"""
@@ -116,38 +304,26 @@ Respond in JSON format:
         model_name = model_config['openrouter_name']
         
         # Create optimized prompt
-        messages = self._create_optimized_prompt(review_text, category)
+        messages, prefix_reused = self._create_optimized_prompt(review_text, category)
         
         # Calculate tokens and cost
-        prompt_text = str(messages)
-        prompt_tokens = self._count_tokens(prompt_text)
+        prompt_tokens = self.token_counter.count_messages(messages)
         estimated_cost = self._estimate_cost(model_config, prompt_tokens)
         
         # Budget check
         self._check_budget(estimated_cost)
         
         try:
-            # Make real API call
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=model_name,
-                messages=messages,
-                max_tokens=model_config['max_tokens'],
-                temperature=0.1
-            )
+            # Make real API call (free when the response cache has it)
+            completion = await self._complete(model_tier, messages, model_config['max_tokens'], prompt_tokens)
             
             # Track actual cost
-            actual_tokens = response.usage.total_tokens if response.usage else prompt_tokens + 50
-            actual_cost = self._estimate_cost(model_config, actual_tokens)
+            actual_tokens = completion['tokens_used']
+            actual_cost = self._estimate_cost(model_config, actual_tokens) if not completion['cached'] else 0.0
             self.openrouter_config.current_spend += actual_cost
             
-            # Cache conversation for future KV optimization
-            self.conversation_cache[category] = messages + [
-                {"role": "assistant", "content": response.choices[0].message.content}
-            ]
-            
             # Parse response
-            content = response.choices[0].message.content
+            content = completion['content']
             processing_time = time.time() - start_time
             
             return {
@@ -156,55 +332,295 @@ Respond in JSON format:
                 'cost': actual_cost,
                 'tokens_used': actual_tokens,
                 'processing_time': processing_time,
-                'cache_optimized': category in self.conversation_cache
+                'time_to_first_token': completion['time_to_first_token'],
+                'tokens_per_sec': completion['tokens_per_sec'],
+                'stopped_early': completion['stopped_early'],
+                'response_cache_hit': completion['cached'],
+                'coalesced': completion['coalesced'],
+                'cache_optimized': prefix_reused
             }
-            
+        
         except Exception as e:
             print(f"API call failed: {e}")
             raise
     
-    def batch_analyze_reviews(self, reviews: List[Dict], batch_size: int = 5) -> List[Dict]:
-        """Analyze reviews in optimized batches"""
-        results = []
+    def _packing_config(self) -> Dict:
+        """Packing settings with defaults (processing.packing in settings.yaml)"""
+        packing = {
+            'enabled': False,
+            'tiers': ['ultra_lightweight', 'lightweight'],
+            'max_reviews': 10,
+            'max_review_tokens': 150,
+            'max_prompt_tokens': 2000,
+            'output_tokens_per_review': 60,
+            'max_completion_tokens': 800
+        }
+        packing.update(self.config.get('processing', {}).get('packing', {}))
+        return packing
+    
+    def _create_packed_prompt(self, items: List[Tuple[str, str]], category: str) -> List[Dict]:
+        """One prompt for several (review_id, text) items with a JSON-array answer"""
+        reviews_block = "\n".join(
+            json.dumps({"review_id": review_id, "text": text}) for review_id, text in items
+        )
+        user_prompt = f"""Analyze each {category.lower()} product review below for sentiment, quality, recommendation and one key insight.
+
+Respond with only a JSON array, one object per review in the same order:
+[{{"review_id": "", "sentiment": "Positive|Negative|Neutral", "quality": "", "recommendation": "", "insights": []}}]
+
+Reviews (one JSON object per line):
+{reviews_block}"""
+
+        return [
+            {"role": "system", "content": f"You are an expert at analyzing {category.lower()} product reviews."},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    @staticmethod
+    def _parse_packed_response(content: str) -> Dict[str, Dict]:
+        """Per-review answers keyed by review_id; malformed output yields what parsed
+        
+        Elements are decoded one at a time, so a garbled element or an array
+        cut off at max_tokens only loses those reviews, not the whole pack.
+        """
+        decoder = json.JSONDecoder()
+        answers = {}
+        position = content.find('{', max(content.find('['), 0))
+        while position >= 0:
+            try:
+                answer, end = decoder.raw_decode(content, position)
+            except json.JSONDecodeError:
+                position = content.find('{', position + 1)  # Skip to the next element
+                continue
+            if isinstance(answer, dict) and 'review_id' in answer and answer.get('sentiment'):
+                answers[str(answer['review_id'])] = answer
+            position = content.find('{', end)
+        return answers
+    
+    async def analyze_reviews_packed(self, reviews: List[Dict], review_ids: List[str],
+                                     model_tier: str) -> List[Optional[Dict]]:
+        """Analyze same-category reviews in one request and fan answers back out
+        
+        Returns one result per review, shaped like analyze_review_real's, with
+        cost and tokens split by each review's share of the prompt. Reviews
+        missing from (or malformed in) the answer are retried singly; a
+        review whose retry also fails comes back as None.
+        """
+        start_time = time.time()
+        category = reviews[0]['category']
+        model_config = self._get_model_config(model_tier)
+        model_name = model_config['openrouter_name']
+        packing = self._packing_config()
+        
+        messages = self._create_packed_prompt(
+            [(review_id, review['review_text']) for review_id, review in zip(review_ids, reviews)], category
+        )
+        prompt_tokens = self.token_counter.count_messages(messages)
+        per_review_output = min(packing['output_tokens_per_review'], model_config['max_tokens'])
+        max_tokens = per_review_output * len(reviews)
+        
+        self._check_budget(self._estimate_cost(model_config, prompt_tokens, max_tokens))
+        
+        # Not streamed: the answer is only usable once the whole array is in
+        completion = await self._complete(model_tier, messages, max_tokens, prompt_tokens, stream=False)
+        actual_tokens = completion['tokens_used']
+        actual_cost = self._estimate_cost(model_config, actual_tokens, 0)
+        self.openrouter_config.current_spend += actual_cost
+        
+        answers = self._parse_packed_response(completion['content'])
+        review_tokens = [max(1, self._count_tokens(review['review_text'])) for review in reviews]
+        total_review_tokens = sum(review_tokens)
+        processing_time = time.time() - start_time
+        
+        results: List[Optional[Dict]] = []
+        for review_id, review, tokens in zip(review_ids, reviews, review_tokens):
+            answer = answers.get(review_id)
+            if answer is None:
+                # Retry singly: the packed answer lost or garbled this review
+                try:
+                    results.append(await self.analyze_review_real(review, model_tier))
+                except Exception as e:
+                    print(f"⚠️ Packed review {review_id} failed its single retry: {e}")
+                    results.append(None)
+                continue
+            
+            share = tokens / total_review_tokens
+            results.append({
+                'content': json.dumps(answer),
+                'model_used': model_name,
+                'cost': actual_cost * share,
+                'tokens_used': round(actual_tokens * share),
+                'processing_time': processing_time,
+                'response_cache_hit': completion['cached'],
+                'cache_optimized': False,
+                'packed_with': len(reviews)
+            })
+        return results
+    
+    def _plan_requests(self, reviews: List[Dict], pack: bool) -> List[Tuple[str, List[int]]]:
+        """Group review indices into (model_tier, indices) requests
+        
+        Short reviews of the same category and a packable tier share a
+        request until the pack hits max_reviews, its review tokens reach
+        max_prompt_tokens, or its answers would exceed max_completion_tokens
+        (output_tokens_per_review each, capped by the tier's max_tokens).
+        Everything else is sent alone.
+        """
+        packing = self._packing_config()
+        requests = []
+        open_packs: Dict[Tuple[str, str], Dict] = {}
+        
+        for index, review in enumerate(reviews):
+            model_tier = self._route_to_model(review['review_text'], review['category'])
+            if not pack or model_tier not in packing['tiers']:
+                requests.append((model_tier, [index]))
+                continue
+            
+            tokens = self._count_tokens(review['review_text'])
+            if tokens > packing['max_review_tokens']:
+                requests.append((model_tier, [index]))
+                continue
+            
+            key = (review['category'], model_tier)
+            review_id = review.get('review_id', f'review_{index}')
+            per_review_output = min(packing['output_tokens_per_review'],
+                                    self._get_model_config(model_tier)['max_tokens'])
+            current = open_packs.get(key)
+            if current is not None and (
+                len(current['indices']) >= packing['max_reviews']
+                or current['tokens'] + tokens > packing['max_prompt_tokens']
+                or (len(current['indices']) + 1) * per_review_output > packing['max_completion_tokens']
+                or review_id in current['review_ids']
+            ):
+                requests.append((model_tier, current['indices']))
+                current = None
+            if current is None:
+                current = open_packs[key] = {'indices': [], 'tokens': 0, 'review_ids': set()}
+            
+            current['indices'].append(index)
+            current['tokens'] += tokens
+            current['review_ids'].add(review_id)
+        
+        requests.extend((model_tier, pack_state['indices']) for (_, model_tier), pack_state in open_packs.items())
+        return requests
+    
+    def batch_analyze_reviews(self, reviews: List[Dict], batch_size: int = 5,
+                              max_in_flight: Optional[int] = None,
+                              pack: Optional[bool] = None) -> List[Dict]:
+        """Analyze reviews concurrently (synchronous wrapper for existing callers)
+        
+        batch_size is accepted for backward compatibility; concurrency is now
+        bounded by max_in_flight (default: processing.max_in_flight).
+        """
+        async def run_batch():
+            try:
+                return await self.abatch_analyze_reviews(reviews, max_in_flight, pack)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run_batch())
+    
+    async def abatch_analyze_reviews(self, reviews: List[Dict], max_in_flight: Optional[int] = None,
+                                     pack: Optional[bool] = None) -> List[Dict]:
+        """Analyze reviews on the running loop with at most max_in_flight requests open
+        
+        With `pack` (default: processing.packing.enabled), short reviews of
+        the same category and cheap tier share one request. Near-duplicates
+        of a review already analyzed (processing.dedup) reuse its result at
+        no cost, marked with `duplicate_of`. Results come back in input
+        order; reviews that fail are skipped.
+        """
+        processing = self.config.get('processing', {})
+        if max_in_flight is None:
+            max_in_flight = processing.get('max_in_flight', 20)
+        if pack is None:
+            pack = self._packing_config()['enabled']
         
-        # Group by category for conversation reuse
         by_category = {}
         for review in reviews:
-            category = review['category']
-            if category not in by_category:
-                by_category[category] = []
-            by_category[category].append(review)
-        
-        # Process each category
-        for category, category_reviews in by_category.items():
-            print(f"🔄 Processing {len(category_reviews)} {category} reviews with OpenRouter...")
-            
-            # Process in batches
-            for i in range(0, len(category_reviews), batch_size):
-                batch = category_reviews[i:i + batch_size]
+            by_category[review['category']] = by_category.get(review['category'], 0) + 1
+        for category, count in by_category.items():
+            print(f"🔄 Processing {count} {category} reviews with OpenRouter...")
+        
+        slots: List[Optional[Dict]] = [None] * len(reviews)
+        if self.deduplicator is None:
+            await self._run_requests(reviews, list(range(len(reviews))), slots, max_in_flight, pack)
+            return [result for result in slots if result is not None]
+        
+        # Only one representative per near-duplicate cluster is routed and billed
+        representatives: Dict[int, int] = {}
+        duplicates: Dict[int, DuplicateMatch] = {}
+        for index, review in enumerate(reviews):
+            key, match = self.deduplicator.add(review['review_text'], review['category'])
+            if match is None:
+                representatives[index] = key
+            else:
+                duplicates[index] = match
+        if duplicates:
+            print(f"🧬 Collapsed {len(duplicates)} near-duplicate reviews onto earlier representatives")
+        
+        await self._run_requests(reviews, list(representatives), slots, max_in_flight, pack)
+        for index, key in representatives.items():
+            if slots[index] is not None:
+                self.deduplicator.attach(key, slots[index])
+        
+        orphans = []
+        for index, match in duplicates.items():
+            source = self.deduplicator.payload(match.representative)
+            if source is None:
+                orphans.append(index)  # Representative failed or was evicted: analyze on its own
+                continue
+            slots[index] = {
+                'review_id': reviews[index].get('review_id', f'review_{index}'),
+                'category': reviews[index]['category'],
+                'result': {
+                    **source['result'],
+                    'cost': 0.0,
+                    'tokens_used': 0,
+                    'duplicate_of': source['review_id'],
+                    'duplicate_similarity': round(match.similarity, 3)
+                },
+                'model_tier': source['model_tier']
+            }
+        if orphans:
+            await self._run_requests(reviews, orphans, slots, max_in_flight, pack)
+        return [result for result in slots if result is not None]
+    
+    async def _run_requests(self, reviews: List[Dict], indices: List[int], slots: List[Optional[Dict]],
+                            max_in_flight: int, pack: bool):
+        """Plan and send the reviews at `indices`, filling their slots"""
+        requests = [
+            (model_tier, [indices[i] for i in planned])
+            for model_tier, planned in self._plan_requests([reviews[i] for i in indices], pack)
+        ]
+        pending = iter(requests)
+        
+        async def worker():
+            # Each worker pulls the next request as soon as its previous call returns
+            for model_tier, indices in pending:
+                review_ids = [reviews[i].get('review_id', f'review_{i}') for i in indices]
+                try:
+                    # Make API call
+                    if len(indices) == 1:
+                        results = [await self.analyze_review_real(reviews[indices[0]], model_tier)]
+                    else:
+                        results = await self.analyze_reviews_packed(
+                            [reviews[i] for i in indices], review_ids, model_tier
+                        )
+                    
+                    for index, review_id, result in zip(indices, review_ids, results):
+                        if result is not None:
+                            slots[index] = {
+                                'review_id': review_id,
+                                'category': reviews[index]['category'],
+                                'result': result,
+                                'model_tier': model_tier
+                            }
                 
-                for review in batch:
-                    try:
-                        # Route to optimal model
-                        model_tier = self._route_to_model(review['review_text'], category)
-                        
-                        # Make API call
-                        result = asyncio.run(self.analyze_review_real(review, model_tier))
-                        results.append({
-                            'review_id': review.get('review_id', f'review_{len(results)}'),
-                            'category': category,
-                            'result': result,
-                            'model_tier': model_tier
-                        })
-                        
-                        # Small delay to avoid rate limits
-                        time.sleep(0.1)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Skipping review due to error: {e}")
-                        continue
+                except Exception as e:
+                    print(f"⚠️ Skipping {len(indices)} review(s) due to error: {e}")
         
-        return results
+        await asyncio.gather(*(worker() for _ in range(min(max_in_flight, len(requests)))))
     
     def _route_to_model(self, review_text: str, category: str) -> str:
         """Smart routing logic (same as original)"""
@@ -226,8 +642,13 @@ Respond in JSON format:
         return {
             'total_spent': round(self.openrouter_config.current_spend, 6),
             'remaining_budget': round(self.openrouter_config.max_budget - self.openrouter_config.current_spend, 6),
-            'conversation_contexts': len(self.conversation_cache),
-            'models_used': list(self.config['models'].keys())
+            'prompt_context': self.context_manager.get_stats(),
+            'models_used': list(self.config['models'].keys()),
+            'rate_limits': self.rate_limiter.get_stats(),
+            'streaming': self.stream_metrics.get_stats(),
+            'response_cache': self.response_cache.get_stats() if self.response_cache is not None else None,
+            'singleflight': self.singleflight.get_stats(),
+            'near_duplicates': self.deduplicator.get_stats() if self.deduplicator is not None else None
         }
 
 
@@ -274,9 +695,15 @@ if __name__ == "__main__":
     # Create optimizer
     optimizer = OpenRouterOptimizer()
     
+    async def single_call():
+        try:
+            return await optimizer.analyze_review_real(test_review)
+        finally:
+            await optimizer.aclose()
+    
     # Test API call
     try:
-        result = asyncio.run(optimizer.analyze_review_real(test_review))
+        result = asyncio.run(single_call())
         print("✅ OpenRouter API test successful!")
         print(f"Model: {result['model_used']}")
         print(f"Cost: ${result['cost']:.6f}")
@@ -287,7 +714,7 @@ if __name__ == "__main__":
         print(f"\n💰 Cost Report:")
         print(f"Spent: ${report['total_spent']:.6f}")
         print(f"Remaining: ${report['remaining_budget']:.6f}")
-        
+    
     except Exception as e:
         print(f"❌ Test failed: {e}")
         print("Make sure OPENROUTER_API_KEY is set in your environment")
\ No newline at end of file
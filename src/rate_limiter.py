@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter: Per-Model Token Buckets
+Keeps each model tier under its requests-per-minute and tokens-per-minute quota
+"""
+
+import time
+import asyncio
+from typing import Dict, Tuple
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `capacity` units"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # Units refilled per second
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)"""
+        self._refill()
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+    
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+    
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ModelRateLimiter:
+    """Request and token buckets per model tier, built from settings.yaml
+    
+    A tier's `requests_per_minute` / `tokens_per_minute` entries under
+    `models.<tier>` enable its buckets; tiers without them are unlimited.
+    Callers reserve prompt + max completion tokens before a request and
+    settle with the provider's usage afterwards, so unused reservation
+    flows back into the bucket.
+    """
+    
+    def __init__(self, models_config: Dict[str, Dict]):
+        self.request_buckets: Dict[str, TokenBucket] = {}
+        self.token_buckets: Dict[str, TokenBucket] = {}
+        for tier, model in models_config.items():
+            if model.get('requests_per_minute'):
+                self.request_buckets[tier] = TokenBucket(model['requests_per_minute'])
+            if model.get('tokens_per_minute'):
+                self.token_buckets[tier] = TokenBucket(model['tokens_per_minute'])
+        
+        # Waiters on a tier queue in arrival order; locks are per event loop
+        self.locks: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = {}
+        self.waits: Dict[str, int] = {}
+        self.wait_seconds: Dict[str, float] = {}
+    
+    async def acquire(self, tier: str, tokens: int):
+        """Reserve one request and `tokens` tokens, sleeping only if a bucket is short"""
+        requests = self.request_buckets.get(tier)
+        budget = self.token_buckets.get(tier)
+        if requests is None and budget is None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        if tier not in self.locks or self.locks[tier][0] is not loop:
+            self.locks[tier] = (loop, asyncio.Lock())
+        
+        async with self.locks[tier][1]:
+            while True:
+                delay = max(
+                    requests.wait_time(1) if requests is not None else 0.0,
+                    budget.wait_time(tokens) if budget is not None else 0.0
+                )
+                if delay <= 0:
+                    break
+                self.waits[tier] = self.waits.get(tier, 0) + 1
+                self.wait_seconds[tier] = self.wait_seconds.get(tier, 0.0) + delay
+                await asyncio.sleep(delay)
+            
+            if requests is not None:
+                requests.take(1)
+            if budget is not None:
+                budget.take(tokens)
+    
+    def settle(self, tier: str, reserved: int, used: int):
+        """Return reserved-but-unused tokens (or charge an overrun) once usage is known"""
+        budget = self.token_buckets.get(tier)
+        if budget is not None and used != reserved:
+            budget.give_back(reserved - used)
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        tiers = set(self.request_buckets) | set(self.token_buckets)
+        return {
+            tier: {
+                'requests_per_minute': self.request_buckets[tier].capacity if tier in self.request_buckets else None,
+                'tokens_per_minute': self.token_buckets[tier].capacity if tier in self.token_buckets else None,
+                'waits': self.waits.get(tier, 0),
+                'wait_seconds': round(self.wait_seconds.get(tier, 0.0), 3)
+            }
+            for tier in sorted(tiers)
+        }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Response Cache: Persistent Exact-Match Completion Cache
+SQLite-backed store of API responses keyed by model, rendered messages and
+sampling parameters, so reruns and crash recovery skip paid calls
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+
+class ResponseCache:
+    """Size-bounded on-disk cache of chat completion results
+    
+    Keys are a blake2b digest of the exact request (model, messages,
+    max_tokens, temperature), so any prompt or parameter change misses.
+    Completions cut short by an early stop also key on the fields they
+    stopped at, so a truncated answer never serves a full request.
+    Each write is committed immediately (WAL journal), so entries survive
+    a crash. Once max_entries is exceeded the least recently used entries
+    are evicted in one batch down to `evict_to` of the limit.
+    """
+    
+    def __init__(self, path: str = "data/response_cache.sqlite", max_entries: int = 100_000,
+                 evict_to: float = 0.9):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_to = evict_to
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Durable across process crashes
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key BLOB PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                tokens_used INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.db.commit()
+        self.entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+    
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], max_tokens: int, temperature: float,
+                 stop_fields: Sequence[str] = ()) -> bytes:
+        request = [model, messages, max_tokens, temperature]
+        if stop_fields:
+            request.append(list(stop_fields))
+        rendered = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.blake2b(rendered.encode('utf-8'), digest_size=16).digest()
+    
+    def get(self, model: str, messages: List[Dict], max_tokens: int, temperature: float,
+            stop_fields: Sequence[str] = ()) -> Optional[Dict]:
+        """Cached {'content', 'tokens_used'} for this exact request, or None"""
+        key = self.make_key(model, messages, max_tokens, temperature, stop_fields)
+        row = self.db.execute("SELECT content, tokens_used FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        self.hits += 1
+        self.tokens_saved += row[1]
+        return {'content': row[0], 'tokens_used': row[1]}
+    
+    def set(self, model: str, messages: List[Dict], max_tokens: int, temperature: float,
+            content: str, tokens_used: int, stop_fields: Sequence[str] = ()):
+        key = self.make_key(model, messages, max_tokens, temperature, stop_fields)
+        now = time.time()
+        exists = self.db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, model, content, tokens_used, created, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, content, tokens_used, now, now)
+        )
+        if not exists:
+            self.entries += 1
+        if self.entries > self.max_entries:
+            self._evict()
+        self.db.commit()
+    
+    def _evict(self):
+        # Batch eviction so a full cache does not delete on every insert
+        excess = self.entries - int(self.max_entries * self.evict_to)
+        self.db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+            (excess,)
+        )
+        self.entries -= excess
+        self.evictions += excess
+    
+    def clear(self):
+        self.db.execute("DELETE FROM responses")
+        self.db.commit()
+        self.entries = 0
+    
+    def close(self):
+        self.db.close()
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'entries': self.entries,
+            'max_entries': self.max_entries,
+            'size_kb': round(sum(
+                os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path)
+            ) / 1024, 1),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups > 0 else 0.0,
+            'evictions': self.evictions,
+            'tokens_saved': self.tokens_saved
+        }
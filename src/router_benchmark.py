@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Router Benchmark: Throughput, Latency and Allocation Baselines
+Times every routing entry point on a deterministic synthetic corpus and
+fails when throughput regresses past a tolerance against a saved baseline
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from smart_router_v2 import SmartRouterV2, AHOCORASICK_AVAILABLE
+from main import ModelRouter
+from openrouter_integration import OpenRouterOptimizer
+
+DEFAULT_BASELINE_PATH = "docs/results/router_benchmark_baseline.json"
+
+CATEGORIES = ['Electronics', 'Books', 'Home_and_Garden']
+
+# Vocabulary for synthetic reviews (fixed here so corpus changes are explicit)
+FILLER_WORDS = [
+    'the', 'this', 'it', 'was', 'and', 'i', 'with', 'for', 'after', 'week',
+    'product', 'really', 'quite', 'item', 'bought', 'use', 'daily', 'again'
+]
+TECHNICAL_TERMS = {
+    'Electronics': ['processor', 'battery', 'bluetooth', 'hdmi', 'resolution', 'firmware', 'latency', 'ssd'],
+    'Books': ['plot', 'character', 'narrative', 'prose', 'pacing', 'dialogue', 'theme', 'author'],
+    'Home_and_Garden': ['material', 'durability', 'assembly', 'mounting', 'capacity', 'warranty', 'rust', 'tools']
+}
+SPECIFICATIONS = ['16GB', '3.2 GHz', '27"', '5 inches', '512 MB', '40mm', '120 cm', '4000 mAh']
+SIMPLE_SENTIMENT = ['love it', 'great', 'terrible', 'perfect', 'awful', 'would recommend', 'disappointed']
+MIXED_SENTIMENT = ['however', 'but', 'although', 'mixed feelings', 'on the other hand', 'sometimes', 'overall']
+COMPARISONS = ['better than', 'compared to', 'versus', 'worse than']
+
+# Review shapes in the corpus, cycled in this order
+REVIEW_KINDS = ('short', 'long', 'spec_heavy', 'mixed_sentiment')
+
+
+def _sentence(rng: random.Random, words: List[str], length: int) -> str:
+    return ' '.join(rng.choice(words) for _ in range(length)).capitalize() + '.'
+
+
+def build_corpus(size: int = 2000, seed: int = 42) -> List[Tuple[str, str, str]]:
+    """Deterministic (kind, text, category) reviews, evenly split across kinds and categories"""
+    rng = random.Random(seed)
+    corpus = []
+    
+    for i in range(size):
+        kind = REVIEW_KINDS[i % len(REVIEW_KINDS)]
+        category = CATEGORIES[(i // len(REVIEW_KINDS)) % len(CATEGORIES)]
+        technical = TECHNICAL_TERMS[category]
+        
+        if kind == 'short':
+            text = f"{rng.choice(SIMPLE_SENTIMENT).capitalize()}. {_sentence(rng, FILLER_WORDS, rng.randint(3, 8))}"
+        elif kind == 'long':
+            sentences = [
+                _sentence(rng, FILLER_WORDS + technical, rng.randint(12, 30))
+                for _ in range(rng.randint(8, 16))
+            ]
+            text = ' '.join(sentences)
+        elif kind == 'spec_heavy':
+            parts = []
+            for _ in range(rng.randint(4, 8)):
+                parts.append(f"The {rng.choice(technical)} is {rng.choice(SPECIFICATIONS)}")
+                parts.append(f"{rng.choice(COMPARISONS)} my old one")
+            text = '. '.join(parts) + '.'
+        else:
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                sentences.append(
+                    f"{rng.choice(SIMPLE_SENTIMENT).capitalize()} {rng.choice(MIXED_SENTIMENT)} "
+                    f"{_sentence(rng, FILLER_WORDS + technical, rng.randint(5, 12)).lower()}"
+                )
+            text = ' '.join(sentences)
+        
+        corpus.append((kind, text, category))
+    return corpus
+
+
+def build_targets() -> Dict[str, Callable[[str, str], object]]:
+    """Routing entry points under test, keyed by benchmark name"""
+    smart_router = SmartRouterV2()
+    model_router = ModelRouter()
+    # Routing needs no API client, so skip __init__ (API key, tokenizer download)
+    optimizer = OpenRouterOptimizer.__new__(OpenRouterOptimizer)
+    
+    return {
+        'SmartRouterV2.route_review': smart_router.route_review,
+        'ModelRouter.route_request': model_router.route_request,
+        'OpenRouterOptimizer._route_to_model': optimizer._route_to_model
+    }
+
+
+def _percentile(ordered: List[int], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def measure_throughput(route: Callable, corpus: List[Tuple[str, str, str]], repeats: int = 5) -> float:
+    """Best reviews/sec over several full passes of the corpus"""
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _kind, text, category in corpus:
+            route(text, category)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(corpus) / elapsed)
+    return best
+
+
+def measure_latency(route: Callable, corpus: List[Tuple[str, str, str]]) -> Dict[str, float]:
+    """Per-call latency percentiles in microseconds"""
+    timings = []
+    for _kind, text, category in corpus:
+        start = time.perf_counter_ns()
+        route(text, category)
+        timings.append(time.perf_counter_ns() - start)
+    
+    timings.sort()
+    return {
+        'p50_us': round(_percentile(timings, 50) / 1000, 2),
+        'p95_us': round(_percentile(timings, 95) / 1000, 2),
+        'p99_us': round(_percentile(timings, 99) / 1000, 2),
+        'max_us': round(timings[-1] / 1000, 2)
+    }
+
+
+def measure_allocations(route: Callable, corpus: List[Tuple[str, str, str]]) -> Dict[str, float]:
+    """Allocated bytes/blocks per call and peak traced memory (separate pass; tracing slows calls)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [route(text, category) for _kind, text, category in corpus]
+    after = tracemalloc.take_snapshot()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    # Results are still alive at the second snapshot, so returned objects count as allocations
+    growth = [stat for stat in after.compare_to(before, 'filename') if stat.size_diff > 0]
+    del results
+    return {
+        'bytes_per_call': round(sum(stat.size_diff for stat in growth) / len(corpus), 1),
+        'blocks_per_call': round(sum(stat.count_diff for stat in growth) / len(corpus), 2),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(size: int = 2000, seed: int = 42, repeats: int = 5) -> Dict:
+    """Benchmark every routing entry point on the same corpus"""
+    corpus = build_corpus(size, seed)
+    results = {}
+    
+    for name, route in build_targets().items():
+        for _kind, text, category in corpus[:100]:  # Warm-up
+            route(text, category)
+        
+        results[name] = {
+            'reviews_per_sec': round(measure_throughput(route, corpus, repeats), 1),
+            'latency': measure_latency(route, corpus),
+            'allocations': measure_allocations(route, corpus)
+        }
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'corpus': {'size': size, 'seed': seed, 'kinds': list(REVIEW_KINDS)},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'ahocorasick': AHOCORASICK_AVAILABLE
+        },
+        'benchmarks': results
+    }
+
+
+def find_regressions(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Benchmarks whose throughput fell more than tolerance below the baseline"""
+    regressions = []
+    for name, result in current['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            continue
+        floor = reference['reviews_per_sec'] * (1 - tolerance)
+        if result['reviews_per_sec'] < floor:
+            regressions.append(
+                f"{name}: {result['reviews_per_sec']:,.0f} reviews/sec "
+                f"< {floor:,.0f} (baseline {reference['reviews_per_sec']:,.0f}, -{tolerance * 100:.0f}%)"
+            )
+    return regressions
+
+
+def print_results(report: Dict, baseline: Dict = None):
+    for name, result in report['benchmarks'].items():
+        latency = result['latency']
+        allocations = result['allocations']
+        change = ""
+        reference = (baseline or {}).get('benchmarks', {}).get(name)
+        if reference:
+            delta = result['reviews_per_sec'] / reference['reviews_per_sec'] - 1
+            change = f" ({delta * 100:+.1f}% vs baseline)"
+        
+        print(f"\n{name}")
+        print(f"  Throughput: {result['reviews_per_sec']:,.0f} reviews/sec{change}")
+        print(f"  Latency: p50 {latency['p50_us']}µs | p95 {latency['p95_us']}µs | p99 {latency['p99_us']}µs")
+        print(f"  Allocations: {allocations['bytes_per_call']:,.0f} B/call | "
+              f"{allocations['blocks_per_call']} blocks/call | peak {allocations['peak_kb']:,.0f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark routing throughput against a saved baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed fractional throughput drop before failing (default 0.10)")
+    parser.add_argument("--size", type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=5, help="Throughput passes (best is kept)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    args = parser.parse_args()
+    
+    print(f"⏱️ Benchmarking routers on {args.size:,} synthetic reviews...")
+    report = run_benchmarks(args.size, args.seed, args.repeats)
+    
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    
+    print_results(report, baseline)
+    
+    if baseline is None:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        sys.exit(0)
+    
+    if baseline.get('corpus') != report['corpus']:
+        print("\n⚠️ Baseline was recorded on a different corpus; throughput comparison may not be meaningful")
+    
+    regressions = find_regressions(report, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Throughput regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    
+    print(f"\n✅ All routers within {args.tolerance * 100:.0f}% of baseline")
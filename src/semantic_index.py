@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Semantic Index: Local Review Embeddings and NumPy IVF Search
+Hashed character n-gram embeddings (no model download, no network) and an
+inverted-file nearest-neighbour index for the semantic response cache
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Multipliers for the rolling n-gram hash and the final bit mix (64-bit, odd)
+_ROLL = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# Words that flip or carry a review's verdict; one bit each in polarity_cues()
+NEGATION_TERMS = ('not', 'no', 'never', 'nothing', 'none', 'nor', 'neither', 'without', 'hardly', 'barely')
+POLARITY_TERMS = (
+    'good', 'great', 'excellent', 'perfect', 'amazing', 'love', 'best', 'recommend', 'happy', 'worth',
+    'bad', 'poor', 'terrible', 'awful', 'worst', 'hate', 'broke', 'broken', 'waste', 'disappointed',
+    'return', 'useless'
+)
+_CUE_BITS = {term: 1 << bit for bit, term in enumerate(NEGATION_TERMS + POLARITY_TERMS)}
+_CUE_TERMS = frozenset(_CUE_BITS)
+_WORD = re.compile(r"[a-z]+")
+
+
+def polarity_cues(text: str) -> int:
+    """Bit mask of the negation and sentiment terms in `text` ("n't" and "cannot" count as "not")
+    
+    Character n-gram embeddings barely move when a review gains a "not"
+    ("would not recommend" scores ~0.98 against "would recommend"), so
+    semantic cache hits also require equal masks.
+    """
+    lowered = text.lower()
+    mask = 0
+    for term in _CUE_TERMS.intersection(_WORD.findall(lowered)):
+        mask |= _CUE_BITS[term]
+    if "n't" in lowered or "cannot" in lowered:
+        mask |= _CUE_BITS['not']
+    return mask
+
+
+class HashedNgramEmbedder:
+    """Unit-length signed feature-hashing vector of character n-grams
+    
+    Lowercased, whitespace-normalised UTF-8 bytes are hashed as rolling
+    n-grams in NumPy (no per-n-gram Python work), so embedding costs tens of
+    microseconds and is identical across processes. Cosine similarity then
+    tracks shared wording: near-duplicates and light rewrites score high,
+    unrelated reviews stay low.
+    """
+    
+    def __init__(self, dim: int = 128, ngram_sizes: Tuple[int, ...] = (3, 4, 5)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+    
+    def embed(self, text: str) -> np.ndarray:
+        data = np.frombuffer(' '.join(text.lower().split()).encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        vector = np.zeros(self.dim, dtype=np.float64)
+        
+        # hashes[i] covers data[i:i + n]; each longer n-gram extends the shorter one
+        hashes = data
+        with np.errstate(over='ignore'):  # uint64 hashing wraps by design
+            for n in range(2, max(self.ngram_sizes) + 1):
+                if len(data) < n:
+                    break
+                hashes = hashes[:len(data) - n + 1] * _ROLL + data[n - 1:]
+                if n not in self.ngram_sizes:
+                    continue
+                mixed = (hashes + np.uint64(n)) * _MIX
+                buckets = (mixed >> np.uint64(32)) % np.uint64(self.dim)
+                signs = (mixed >> np.uint64(31) & np.uint64(1)).astype(np.float64) * 2 - 1
+                vector += np.bincount(buckets.astype(np.intp), weights=signs, minlength=self.dim)
+        
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).astype(np.float32)
+
+
+class _GrowableRows:
+    """Append-only float32 row block (plus int64 ids) with amortised doubling"""
+    
+    def __init__(self, dim: int, capacity: int = 16):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+    
+    def append(self, vector: np.ndarray, vector_id: int):
+        if self.size == len(self.ids):
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+            self.ids = np.concatenate([self.ids, np.empty_like(self.ids)])
+        self.vectors[self.size] = vector
+        self.ids[self.size] = vector_id
+        self.size += 1
+    
+    def extend(self, vectors: np.ndarray, ids: np.ndarray):
+        end = self.size + len(ids)
+        if end > len(self.ids):
+            capacity = max(end, 2 * len(self.ids))
+            grown = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self.size] = self.ids[:self.size]
+            self.vectors, self.ids = grown, grown_ids
+        self.vectors[self.size:end] = vectors
+        self.ids[self.size:end] = ids
+        self.size = end
+
+
+class IVFIndex:
+    """Inverted-file index for inner-product search over unit vectors
+    
+    Below `min_train` vectors the index is a flat matrix searched exactly.
+    After that, k-means centroids (about 2*sqrt(n) of them, at most
+    `max_lists`) split the vectors into lists stored contiguously, and a
+    query scans only the `nprobe` lists nearest to it. Centroids are
+    retrained whenever the index has grown `retrain_growth` times since the
+    last training, so list sizes stay bounded as the cache fills.
+    """
+    
+    def __init__(self, dim: int, nprobe: int = 4, max_lists: int = 2048, min_train: int = 2048,
+                 retrain_growth: int = 4, train_iterations: int = 8, seed: int = 0):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.max_lists = max_lists
+        self.min_train = min_train
+        self.retrain_growth = retrain_growth
+        self.train_iterations = train_iterations
+        self.rng = np.random.default_rng(seed)
+        
+        self.flat = _GrowableRows(dim)
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_GrowableRows] = []
+        self.trained_size = 0
+        self.size = 0
+    
+    def add(self, vector: np.ndarray, vector_id: int):
+        self.size += 1
+        if self.centroids is None:
+            self.flat.append(vector, vector_id)
+            if self.size >= self.min_train:
+                self._train(self.flat.vectors[:self.flat.size], self.flat.ids[:self.flat.size])
+                self.flat = _GrowableRows(self.dim)
+            return
+        
+        self.lists[int(np.argmax(self.centroids @ vector))].append(vector, vector_id)
+        if self.size >= self.trained_size * self.retrain_growth and len(self.lists) < self.max_lists:
+            vectors, ids = self._all_rows()
+            self._train(vectors, ids)
+    
+    def search(self, vector: np.ndarray, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Up to k (ids, scores) with the highest inner product, best first"""
+        if self.centroids is None:
+            return self._top_k(self.flat.vectors[:self.flat.size] @ vector, self.flat.ids[:self.flat.size], k)
+        
+        probes = np.argpartition(-(self.centroids @ vector), min(self.nprobe, len(self.lists)) - 1)[:self.nprobe]
+        blocks = [self.lists[probe] for probe in probes if self.lists[probe].size]
+        if not blocks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.concatenate([rows.vectors[:rows.size] @ vector for rows in blocks])
+        return self._top_k(scores, np.concatenate([rows.ids[:rows.size] for rows in blocks]), k)
+    
+    @staticmethod
+    def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            scores, ids = scores[keep], ids[keep]
+        order = np.argsort(-scores)
+        return ids[order], scores[order]
+    
+    def _all_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.centroids is None:
+            return self.flat.vectors[:self.flat.size].copy(), self.flat.ids[:self.flat.size].copy()
+        return (np.concatenate([rows.vectors[:rows.size] for rows in self.lists]),
+                np.concatenate([rows.ids[:rows.size] for rows in self.lists]))
+    
+    def _train(self, vectors: np.ndarray, ids: np.ndarray):
+        """Spherical k-means on a sample, then reassign every vector to its list"""
+        nlist = max(1, min(self.max_lists, int(2 * np.sqrt(len(vectors)))))
+        sample = vectors[self.rng.choice(len(vectors), min(len(vectors), nlist * 32), replace=False)]
+        centroids = sample[self.rng.choice(len(sample), nlist, replace=False)].copy()
+        
+        for _ in range(self.train_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            clusters, starts = self._group(assignment)
+            centers = np.add.reduceat(sample[np.argsort(assignment, kind='stable')], starts)
+            norms = np.maximum(np.linalg.norm(centers, axis=1, keepdims=True), 1e-12)
+            centroids[clusters] = centers / norms  # Empty clusters keep their old centroid
+        
+        self.centroids = centroids
+        self.lists = [_GrowableRows(self.dim) for _ in range(nlist)]
+        # Chunked so reassignment never materialises an n x nlist matrix at once
+        for start in range(0, len(vectors), 65536):
+            assignment = np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind='stable')
+            chunk, chunk_ids = vectors[start:start + 65536][order], ids[start:start + 65536][order]
+            clusters, starts = self._group(assignment)
+            for cluster, begin, end in zip(clusters, starts, list(starts[1:]) + [len(order)]):
+                self.lists[cluster].extend(chunk[begin:end], chunk_ids[begin:end])
+        self.trained_size = len(vectors)
+    
+    @staticmethod
+    def _group(assignment: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct clusters and where each starts in the stably sorted assignment"""
+        clusters, counts = np.unique(assignment, return_counts=True)
+        return clusters, np.concatenate([[0], np.cumsum(counts)[:-1]])
+    
+    def rebuild(self, keep_ids: np.ndarray):
+        """Drop every vector whose id is not in keep_ids (used to purge evicted entries)"""
+        vectors, ids = self._all_rows()
+        mask = np.isin(ids, keep_ids)
+        vectors, ids = vectors[mask], ids[mask]
+        self.flat = _GrowableRows(self.dim)
+        self.centroids = None
+        self.lists = []
+        self.size = len(ids)
+        if self.size >= self.min_train:
+            self._train(vectors, ids)
+        else:
+            self.flat.extend(vectors, ids)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Shared Semantic Cache: Memory-Mapped Cross-Process Backend
+Drop-in replacement for main.SemanticCache whose entries live in one file
+mapped by every worker on the node, so one worker's results serve all
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from main import ProductReviewResult
+from semantic_index import HashedNgramEmbedder, polarity_cues
+
+# POSIX byte-range locks (lock striping across processes)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+_MAGIC = b"SEMCACHE"
+_VERSION = 2
+_HEADER_SIZE = 4096
+_HEADER_FIELDS = np.dtype([('magic', 'S8'), ('version', '<u4'), ('dim', '<u4'),
+                           ('capacity', '<u4'), ('bucket_size', '<u4'), ('payload_size', '<u4')])
+_LOCK_BASE = 1 << 40  # Lock byte ranges sit far past the data; locks need not cover real bytes
+
+# Slot states
+_EMPTY, _LIVE = 0, 1
+
+
+class SharedSemanticCache:
+    """SemanticCache with get/set served from a shared memory-mapped table
+    
+    The file holds `max_size` slots in buckets of `bucket_size`; a review's
+    full-content blake2b key picks its bucket, and a full bucket replaces
+    its least recently used slot. Each slot stores the key, category hash,
+    polarity_cues mask (hits need equal masks, as in SemanticCache),
+    embedding and JSON result side by side, viewed through NumPy arrays over
+    the mapping (no copies, no per-process index to rebuild).
+    
+    Writers lock only their bucket's stripe (`stripes` fcntl byte-range
+    locks), so workers writing different buckets never wait on each other.
+    Similarity search scans the mapped embeddings without a lock and then
+    re-validates the chosen slot under its stripe lock. Works the same with
+    one process or many; without fcntl (Windows) it is single-process only.
+    """
+    
+    def __init__(self, max_size: int = 16384, similarity_threshold: float = 0.8,
+                 category_thresholds: Optional[Dict[str, float]] = None,
+                 embedder: Optional[HashedNgramEmbedder] = None,
+                 path: str = "data/semantic_cache.mmap", bucket_size: int = 8,
+                 payload_size: int = 1024, stripes: int = 64):
+        self.similarity_threshold = similarity_threshold
+        self.category_thresholds = category_thresholds or {}
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.path = path
+        self.bucket_size = bucket_size
+        self.buckets = max(1, -(-max_size // bucket_size))
+        self.max_size = self.buckets * bucket_size
+        self.payload_size = payload_size
+        self.stripes = stripes
+        
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked(-1):  # Serialize creation and header checks across workers
+            self._init_file()
+        self.map = mmap.mmap(self.fd, self._file_size())
+        self._map_arrays()
+        
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+        self.oversized = 0
+        self.polarity_mismatches = 0  # Misses where a similar entry was rejected for its cues
+        self._last_embedding = (None, None)  # set() usually follows a miss on the same text
+    
+    def _layout(self) -> Dict[str, Tuple[int, tuple, str]]:
+        """Offset, shape and dtype of each slot array in the file"""
+        n, dim = self.max_size, self.embedder.dim
+        fields = [
+            ('keys', (n, 16), 'u1'),
+            ('categories', (n,), '<u8'),
+            ('cues', (n,), '<u8'),
+            ('accessed', (n,), '<u8'),
+            ('lengths', (n,), '<u4'),
+            ('states', (n,), 'u1'),
+            ('vectors', (n, dim), '<f4'),
+            ('payloads', (n, self.payload_size), 'u1'),
+        ]
+        layout, offset = {}, _HEADER_SIZE
+        for name, shape, dtype in fields:
+            layout[name] = (offset, shape, dtype)
+            offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 64) * 64  # 64-byte aligned
+        layout['end'] = (offset, (), '')
+        return layout
+    
+    def _file_size(self) -> int:
+        return self._layout()['end'][0]
+    
+    def _header(self) -> np.ndarray:
+        return np.array([(_MAGIC, _VERSION, self.embedder.dim, self.max_size, self.bucket_size,
+                          self.payload_size)], dtype=_HEADER_FIELDS)
+    
+    def _init_file(self):
+        expected = self._header()
+        if os.fstat(self.fd).st_size == 0:
+            os.ftruncate(self.fd, self._file_size())
+            os.pwrite(self.fd, expected.tobytes(), 0)
+            return
+        found = np.frombuffer(os.pread(self.fd, _HEADER_FIELDS.itemsize, 0), dtype=_HEADER_FIELDS)
+        if found.tobytes() != expected.tobytes():
+            raise ValueError(
+                f"{self.path} was created with a different layout "
+                f"(version/dim/capacity/bucket_size/payload_size {tuple(found[0].tolist())[1:]}, "
+                f"expected {tuple(expected[0].tolist())[1:]}); delete it or match its settings"
+            )
+    
+    def _map_arrays(self):
+        for name, (offset, shape, dtype) in self._layout().items():
+            if name != 'end':
+                setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=self.map, offset=offset))
+    
+    @contextmanager
+    def _locked(self, stripe: int, shared: bool = False) -> Iterator[None]:
+        """Hold one stripe's byte-range lock (-1 is the file-creation lock)"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        fcntl.lockf(self.fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX, 1, _LOCK_BASE + stripe + 1)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, _LOCK_BASE + stripe + 1)
+    
+    @staticmethod
+    def make_key(review_text: str, category: str) -> Tuple[str, bytes]:
+        normalized = ' '.join(review_text.lower().split())
+        digest = hashlib.blake2b(normalized.encode('utf-8', 'surrogatepass'), digest_size=16,
+                                 person=category.encode('utf-8')[:16])
+        return category, digest.digest()
+    
+    @staticmethod
+    def _category_hash(category: str) -> int:
+        return int.from_bytes(hashlib.blake2b(category.encode('utf-8'), digest_size=8).digest(), 'little')
+    
+    def _bucket(self, digest: bytes) -> Tuple[slice, int]:
+        bucket = int.from_bytes(digest[:8], 'little') % self.buckets
+        start = bucket * self.bucket_size
+        return slice(start, start + self.bucket_size), bucket % self.stripes
+    
+    def threshold(self, category: str) -> float:
+        return self.category_thresholds.get(category, self.similarity_threshold)
+    
+    def _embed(self, review_text: str) -> np.ndarray:
+        text, vector = self._last_embedding
+        if text is not review_text:
+            vector = self.embedder.embed(review_text)
+            self._last_embedding = (review_text, vector)
+        return vector
+    
+    def _read(self, slot: int) -> ProductReviewResult:
+        """Decode a slot's result and mark it used (caller holds its stripe lock)"""
+        self.accessed[slot] = time.time_ns()
+        return ProductReviewResult(**json.loads(self.payloads[slot, :self.lengths[slot]].tobytes()))
+    
+    def get(self, review_text: str, category: str) -> Optional[ProductReviewResult]:
+        _, digest = self.make_key(review_text, category)
+        key = np.frombuffer(digest, dtype=np.uint8)
+        slots, stripe = self._bucket(digest)
+        with self._locked(stripe, shared=True):
+            match = np.flatnonzero((self.states[slots] == _LIVE) & (self.keys[slots] == key).all(axis=1))
+            if len(match):
+                result = self._read(slots.start + int(match[0]))
+                self.hits[category] = self.hits.get(category, 0) + 1
+                return result
+        
+        # Lock-free scan over the mapped embeddings; the winner is re-checked under its lock
+        vector = self._embed(review_text)
+        threshold = self.threshold(category)
+        scores = self.vectors @ vector
+        scores[(self.states != _LIVE) | (self.categories != self._category_hash(category))] = -1.0
+        rejected = False
+        similar = np.flatnonzero(scores >= threshold)
+        if len(similar):
+            mismatched = similar[self.cues[similar] != np.uint64(polarity_cues(review_text))]
+            rejected = len(mismatched) > 0
+            scores[mismatched] = -1.0
+        top = np.argpartition(-scores, 3)[:4] if len(scores) > 4 else np.arange(len(scores))
+        for slot in top[np.argsort(-scores[top])]:
+            if scores[slot] < threshold:
+                break
+            snapshot = self.keys[slot].tobytes()  # Same key, same text, same cues
+            with self._locked(self._bucket(snapshot)[1], shared=True):
+                if self.states[slot] == _LIVE and self.keys[slot].tobytes() == snapshot \
+                        and float(self.vectors[slot] @ vector) >= threshold:
+                    result = self._read(int(slot))
+                    self.hits[category] = self.hits.get(category, 0) + 1
+                    return result
+        
+        self.polarity_mismatches += rejected
+        self.misses[category] = self.misses.get(category, 0) + 1
+        return None
+    
+    def set(self, review_text: str, category: str, result: ProductReviewResult):
+        payload = json.dumps(asdict(result), separators=(',', ':')).encode('utf-8')
+        if len(payload) > self.payload_size:
+            self.oversized += 1  # Too large for a slot; stays uncached
+            return
+        
+        _, digest = self.make_key(review_text, category)
+        key = np.frombuffer(digest, dtype=np.uint8)
+        vector = self._embed(review_text)
+        slots, stripe = self._bucket(digest)
+        with self._locked(stripe):
+            states = self.states[slots]
+            same = np.flatnonzero((states == _LIVE) & (self.keys[slots] == key).all(axis=1))
+            empty = np.flatnonzero(states != _LIVE)
+            if len(same):
+                slot = slots.start + int(same[0])
+            elif len(empty):
+                slot = slots.start + int(empty[0])
+            else:
+                slot = slots.start + int(np.argmin(self.accessed[slots]))  # Least recently used
+                self.evictions += 1
+            
+            # Invalidate first so lock-free scanners never pair old keys with new data
+            self.states[slot] = _EMPTY
+            self.keys[slot] = key
+            self.categories[slot] = self._category_hash(category)
+            self.cues[slot] = polarity_cues(review_text)
+            self.vectors[slot] = vector
+            self.payloads[slot, :len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+            self.lengths[slot] = len(payload)
+            self.accessed[slot] = time.time_ns()
+            self.states[slot] = _LIVE
+    
+    def clear(self):
+        for stripe in range(self.stripes):
+            with self._locked(stripe):
+                buckets = np.arange(stripe, self.buckets, self.stripes)
+                slots = (buckets[:, None] * self.bucket_size + np.arange(self.bucket_size)).ravel()
+                self.states[slots] = _EMPTY
+    
+    def close(self):
+        for name in self._layout():
+            if name != 'end':
+                delattr(self, name)  # Views must go before the mapping can close
+        self.map.close()
+        os.close(self.fd)
+    
+    def get_stats(self) -> Dict:
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        categories = {}
+        for category in sorted(set(self.hits) | set(self.misses)):
+            category_hits = self.hits.get(category, 0)
+            category_lookups = category_hits + self.misses.get(category, 0)
+            categories[category] = {
+                'hits': category_hits,
+                'misses': category_lookups - category_hits,
+                'hit_rate': round(category_hits / category_lookups * 100, 1) if category_lookups > 0 else 0.0
+            }
+        return {
+            'size': int(np.count_nonzero(self.states == _LIVE)),  # Shared by every worker
+            'max_size': self.max_size,
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': round(hits / lookups * 100, 1) if lookups > 0 else 0.0,
+            'evictions': self.evictions,
+            'oversized': self.oversized,
+            'polarity_mismatches': self.polarity_mismatches,
+            'similarity_threshold': self.similarity_threshold,
+            'path': self.path,
+            'categories': categories
+        }
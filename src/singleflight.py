@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Singleflight: Coalescing of Identical In-Flight Requests
+Concurrent calls with the same key share one execution; the first caller
+runs it and the rest await its outcome
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent async calls
+    
+    Only calls that overlap in time are merged: once the leader finishes,
+    its key is released and the next call runs again (caching completed
+    results is the caches' job). Waiters receive the leader's result or
+    its exception, and are cancelled if the leader is cancelled.
+    """
+    
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run call() unless one is already running for key; returns (result, shared)"""
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shielded so one cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future), True
+        
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marks it retrieved when no one was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self.in_flight[key]
+    
+    def get_stats(self) -> Dict:
+        requests = self.calls + self.coalesced
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / requests * 100, 1) if requests > 0 else 0.0
+        }
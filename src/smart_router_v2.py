@@ -6,10 +6,34 @@ Implements intelligent model routing for 90%+ cost reduction
 
 import re
 import math
-from typing import Dict, List, Tuple
+import os
+import hashlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 
-@dataclass
+import numpy as np
+
+# Optional C Aho-Corasick automaton for single-pass keyword scanning
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Numeric and spec patterns compiled once ("16GB", "5 inches", "27\"")
+NUMBER_PATTERN = re.compile(r'\d+')
+SPEC_PATTERN = re.compile(r'(\d+\s*(gb|mb|ghz|mhz|inches|"|\'|mm|cm))')
+
+# Comparison phrases that signal a technical trade-off discussion
+COMPARISON_PHRASES = ['vs', 'versus', 'compared to', 'better than', 'worse than']
+
+# Tier order used for uint8 tier codes in batch results (cheapest first)
+TIER_NAMES = ('ultra_lightweight', 'lightweight', 'medium', 'advanced', 'premium')
+
+@dataclass(frozen=True)
 class ComplexityScore:
     """Content complexity analysis result"""
     technical_score: float  # 0-1, technical complexity
@@ -19,10 +43,264 @@ class ComplexityScore:
     final_score: float      # 0-1, weighted final complexity
     recommended_tier: str   # Model tier recommendation
 
+@dataclass
+class KeywordCounts:
+    """Indicator counts produced by a single keyword scan of a review"""
+    technical_matches: int  # Distinct category technical keywords present
+    complex_sentiment: int  # Distinct complex sentiment indicators present
+    simple_sentiment: int   # Distinct simple sentiment indicators present
+    domain_matches: int     # Distinct category domain indicators present
+    has_comparisons: bool   # Any comparison phrase present
+    has_specifications: bool  # Number followed by a spec unit
+    has_numbers: bool       # Any digit present
+
+@dataclass
+class ReviewFeatures:
+    """Everything the complexity analyzers read from a review, extracted once
+    
+    Built by SmartRouterV2.extract_features; the technical, sentiment, length
+    and domain scorers consume it instead of re-lowercasing, re-splitting and
+    re-scanning the raw text, and learned models and cost projections can
+    reuse the same counts.
+    """
+    category: Optional[str]
+    text_lower: str
+    word_count: int         # Whitespace-separated words
+    sentence_count: int     # Non-empty '.'-separated segments
+    keywords: KeywordCounts
+
+@dataclass
+class BatchRoutingResult:
+    """Columnar routing results for a batch of reviews (one row per review)"""
+    technical_scores: np.ndarray  # float64 sub-scores
+    sentiment_scores: np.ndarray
+    length_scores: np.ndarray
+    domain_scores: np.ndarray
+    final_scores: np.ndarray      # float64 weighted complexity
+    tier_codes: np.ndarray        # uint8 index into TIER_NAMES
+    cost_per_million: np.ndarray  # float64 tier price per review
+    word_counts: np.ndarray       # int64 whitespace word counts
+    
+    def __len__(self) -> int:
+        return len(self.tier_codes)
+    
+    def tier_names(self) -> List[str]:
+        """Tier name per review"""
+        return [TIER_NAMES[code] for code in self.tier_codes.tolist()]
+    
+    def tier_counts(self) -> Dict[str, int]:
+        """Number of reviews routed to each tier"""
+        counts = np.bincount(self.tier_codes, minlength=len(TIER_NAMES))
+        return {name: int(count) for name, count in zip(TIER_NAMES, counts) if count}
+
+@dataclass
+class CorpusRoutingSummary:
+    """Per-tier aggregates for a routed corpus (arrays indexed by tier code)
+    
+    Shards of a corpus produce one summary each; merging them gives the same
+    totals as routing the whole corpus in one process.
+    """
+    tier_counts: np.ndarray       # int64 reviews per tier
+    projected_cost: np.ndarray    # float64 projected USD per tier
+    complexity_sum: np.ndarray    # float64 sum of final scores per tier
+    first_seen: np.ndarray        # int64 global index of first review per tier (-1 = none)
+    examples: Dict[int, List[Dict]]  # tier code -> up to 2 example reviews
+    total_reviews: int = 0
+    
+    @classmethod
+    def empty(cls) -> 'CorpusRoutingSummary':
+        tiers = len(TIER_NAMES)
+        return cls(
+            tier_counts=np.zeros(tiers, dtype=np.int64),
+            projected_cost=np.zeros(tiers),
+            complexity_sum=np.zeros(tiers),
+            first_seen=np.full(tiers, -1, dtype=np.int64),
+            examples={}
+        )
+    
+    def merge(self, other: 'CorpusRoutingSummary') -> 'CorpusRoutingSummary':
+        """Fold another shard's aggregates into this one"""
+        self.tier_counts += other.tier_counts
+        self.projected_cost += other.projected_cost
+        self.complexity_sum += other.complexity_sum
+        self.total_reviews += other.total_reviews
+        
+        for code in range(len(TIER_NAMES)):
+            theirs = other.first_seen[code]
+            if theirs >= 0 and (self.first_seen[code] < 0 or theirs < self.first_seen[code]):
+                self.first_seen[code] = theirs
+        
+        for code, examples in other.examples.items():
+            merged = self.examples.get(code, []) + examples
+            self.examples[code] = sorted(merged, key=lambda example: example['index'])[:2]
+        return self
+    
+    @property
+    def total_projected_cost(self) -> float:
+        return float(self.projected_cost.sum())
+    
+    def tiers_in_order(self) -> List[int]:
+        """Tier codes present, in order of first appearance in the corpus"""
+        present = [code for code in range(len(TIER_NAMES)) if self.tier_counts[code]]
+        return sorted(present, key=lambda code: self.first_seen[code])
+
+class RoutingCache:
+    """Bounded LRU cache of routing decisions keyed on (category, text digest)
+    
+    Texts are normalized with strip() + lower(), which never changes a
+    routing decision (keyword scans already run on lowercased text and word
+    and sentence counts ignore surrounding whitespace), so cached
+    ComplexityScores are exactly what a fresh calculation would return.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.entries: OrderedDict = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(text: str, category: str) -> Tuple[str, bytes]:
+        normalized = text.strip().lower().encode('utf-8', 'surrogatepass')
+        return category, hashlib.blake2b(normalized, digest_size=16).digest()
+    
+    def get(self, key: Tuple[str, bytes]) -> Optional[ComplexityScore]:
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return score
+    
+    def put(self, key: Tuple[str, bytes], score: ComplexityScore):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups > 0 else 0.0
+        }
+
+class LatencyTracker:
+    """Rolling per-tier API latency window with p50/p95 estimates"""
+    
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples  # Samples needed before a tier's stats are trusted
+        self.samples: Dict[str, deque] = {}
+    
+    def record(self, tier: str, latency: float):
+        """Record one completed request's latency in seconds"""
+        if tier not in self.samples:
+            self.samples[tier] = deque(maxlen=self.window)
+        self.samples[tier].append(latency)
+    
+    def percentile(self, tier: str, q: float) -> Optional[float]:
+        """Latency percentile for a tier, or None until min_samples are in"""
+        samples = self.samples.get(tier)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        stats = {}
+        for tier, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats[tier] = {
+                'samples': len(ordered),
+                'p50': round(ordered[len(ordered) // 2], 3),
+                'p95': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3)
+            }
+        return stats
+
+class KeywordMatcher:
+    """Compiled multi-pattern matcher for one category's indicator vocabulary
+    
+    Technical keywords, sentiment indicators, domain indicators and comparison
+    phrases are merged into one Aho-Corasick automaton, so a single pass over
+    the lowercased text reports every phrase present (overlaps included).
+    Without pyahocorasick the merged, de-duplicated vocabulary is scanned once
+    instead. Either way each distinct phrase counts once, exactly like the
+    per-keyword `in` checks it replaces.
+    """
+    
+    # Counter slots in KeywordCounts order
+    TECHNICAL, COMPLEX, SIMPLE, DOMAIN, COMPARISON = range(5)
+    
+    def __init__(self, vocabulary: Dict[int, List[str]]):
+        # Per-phrase contribution to each counter (duplicates count twice,
+        # matching the original sum over keyword lists)
+        totals: Dict[str, List[int]] = {}
+        for slot, phrases in vocabulary.items():
+            for phrase in phrases:
+                totals.setdefault(phrase, [0] * 5)[slot] += 1
+        self.weights: Dict[str, Tuple[int, ...]] = {
+            phrase: tuple(counts) for phrase, counts in totals.items()
+        }
+        
+        self.automaton = None
+        if AHOCORASICK_AVAILABLE and self.weights:
+            self.automaton = ahocorasick.Automaton()
+            for phrase in self.weights:
+                self.automaton.add_word(phrase, phrase)
+            self.automaton.make_automaton()
+    
+    def scan(self, text_lower: str) -> KeywordCounts:
+        """Count every indicator in one pass over lowercased text"""
+        if self.automaton is not None:
+            found = {phrase for _end, phrase in self.automaton.iter(text_lower)}
+        else:
+            found = [phrase for phrase in self.weights if phrase in text_lower]
+        
+        totals = [0] * 5
+        for phrase in found:
+            for slot, weight in enumerate(self.weights[phrase]):
+                totals[slot] += weight
+        
+        has_numbers = NUMBER_PATTERN.search(text_lower) is not None
+        has_specifications = has_numbers and SPEC_PATTERN.search(text_lower) is not None
+        
+        return KeywordCounts(
+            technical_matches=totals[self.TECHNICAL],
+            complex_sentiment=totals[self.COMPLEX],
+            simple_sentiment=totals[self.SIMPLE],
+            domain_matches=totals[self.DOMAIN],
+            has_comparisons=totals[self.COMPARISON] > 0,
+            has_specifications=has_specifications,
+            has_numbers=has_numbers
+        )
+
 class SmartRouterV2:
     """Enhanced smart routing with content complexity analysis"""
     
-    def __init__(self):
+    def __init__(self, cache_size: Optional[int] = None,
+                 latency_tracker: Optional[LatencyTracker] = None,
+                 latency_margin: float = 0.05, latency_advantage: float = 0.8,
+                 latency_cost_ratio: float = 1.0):
+        # Optional routing-decision cache for repeated review texts
+        self.routing_cache = RoutingCache(cache_size) if cache_size else None
+        
+        # Optional latency-aware mode: reviews within latency_margin of a tier
+        # threshold may move to the neighbouring tier when its p95 is below
+        # latency_advantage x the recommended tier's p95 and its cost per token
+        # is at most latency_cost_ratio x the recommended tier's (1.0: never pricier)
+        self.latency_tracker = latency_tracker
+        self.latency_margin = latency_margin
+        self.latency_advantage = latency_advantage
+        self.latency_cost_ratio = latency_cost_ratio
+        
         # Technical keywords by domain
         self.technical_keywords = {
             'Electronics': [
@@ -61,81 +339,127 @@ class SmartRouterV2:
             'disappointed', 'satisfied', 'recommend', 'avoid'
         ]
         
+        # Domain baselines and complexity indicators
+        self.domain_multipliers = {
+            'Electronics': 1.2,  # Technical domain = higher baseline
+            'Books': 0.8,        # Content domain = lower baseline  
+            'Home_and_Garden': 1.0  # Practical domain = standard baseline
+        }
+        
+        self.domain_complexity_indicators = {
+            'Electronics': [
+                'compatibility', 'installation', 'setup', 'configuration',
+                'troubleshooting', 'issues', 'problems', 'defect', 'malfunction'
+            ],
+            'Books': [
+                'analysis', 'interpretation', 'meaning', 'symbolism', 'metaphor',
+                'academic', 'scholarly', 'research', 'complex', 'difficult'
+            ],
+            'Home_and_Garden': [
+                'installation', 'assembly', 'maintenance', 'repair', 'replacement',
+                'compatibility', 'fit', 'size', 'dimensions', 'measurements'
+            ]
+        }
+        
+        # One compiled matcher per category (None = unknown category)
+        self.keyword_matchers: Dict[Optional[str], KeywordMatcher] = {
+            category: self._build_matcher(category)
+            for category in set(self.technical_keywords) | set(self.domain_complexity_indicators)
+        }
+        self.keyword_matchers[None] = self._build_matcher(None)
+        
         # Model tier configuration
         self.model_tiers = {
             'ultra_lightweight': {
                 'cost_per_million': 0.15,
                 'complexity_threshold': 0.2,
+                'quality_floor': 'ultra_lightweight',  # Lowest tier allowed to stand in
                 'use_case': 'Simple positive/negative sentiment'
             },
             'lightweight': {
                 'cost_per_million': 0.25, 
                 'complexity_threshold': 0.4,
+                'quality_floor': 'ultra_lightweight',
                 'use_case': 'Basic review analysis'
             },
             'medium': {
                 'cost_per_million': 0.50,
                 'complexity_threshold': 0.6,
+                'quality_floor': 'lightweight',
                 'use_case': 'Standard analysis with some complexity'
             },
             'advanced': {
                 'cost_per_million': 2.50,
                 'complexity_threshold': 0.8,
+                'quality_floor': 'advanced',
                 'use_case': 'Complex technical analysis'
             },
             'premium': {
                 'cost_per_million': 3.00,
                 'complexity_threshold': 1.0,
+                'quality_floor': 'advanced',
                 'use_case': 'Deep domain expertise required'
             }
         }
     
+    def _build_matcher(self, category: Optional[str]) -> KeywordMatcher:
+        """Compile the indicator vocabulary for a category"""
+        return KeywordMatcher({
+            KeywordMatcher.TECHNICAL: self.technical_keywords.get(category, []),
+            KeywordMatcher.COMPLEX: self.complex_sentiment_indicators,
+            KeywordMatcher.SIMPLE: self.simple_sentiment_indicators,
+            KeywordMatcher.DOMAIN: self.domain_complexity_indicators.get(category, []),
+            KeywordMatcher.COMPARISON: COMPARISON_PHRASES
+        })
+    
+    def extract_features(self, text: str, category: Optional[str]) -> ReviewFeatures:
+        """Lowercase, count and keyword-scan a review in one pass"""
+        text_lower = text.lower()
+        matcher = self.keyword_matchers.get(category) or self.keyword_matchers[None]
+        return ReviewFeatures(
+            category=category,
+            text_lower=text_lower,
+            word_count=len(text.split()),
+            sentence_count=len([s for s in text.split('.') if s.strip()]),
+            keywords=matcher.scan(text_lower)
+        )
+    
     def analyze_technical_complexity(self, text: str, category: str) -> float:
         """Analyze technical complexity of review content"""
-        text_lower = text.lower()
-        
-        # Get domain-specific keywords
-        keywords = self.technical_keywords.get(category, [])
-        
-        # Count technical terms
-        technical_matches = sum(1 for keyword in keywords if keyword in text_lower)
+        return self.score_technical(self.extract_features(text, category))
+    
+    def score_technical(self, features: ReviewFeatures) -> float:
+        """Technical score from extracted features"""
+        word_count = features.word_count
+        counts = features.keywords
         
         # Calculate density (technical terms per 100 words)
-        word_count = len(text.split())
         if word_count == 0:
             return 0.0
         
-        technical_density = (technical_matches / word_count) * 100
-        
-        # Additional technical indicators
-        has_numbers = bool(re.search(r'\d+', text))
-        has_comparisons = bool(re.search(r'(vs|versus|compared to|better than|worse than)', text_lower))
-        has_specifications = bool(re.search(r'(\d+\s*(gb|mb|ghz|mhz|inches|"|\'|mm|cm))', text_lower))
+        technical_density = (counts.technical_matches / word_count) * 100
         
         # Scoring
         base_score = min(technical_density / 10, 0.6)  # Cap at 0.6 for density
         bonus_score = 0.0
         
-        if has_specifications:
+        if counts.has_specifications:
             bonus_score += 0.2
-        if has_comparisons:
+        if counts.has_comparisons:
             bonus_score += 0.1
-        if has_numbers:
+        if counts.has_numbers:
             bonus_score += 0.1
-            
+        
         return min(base_score + bonus_score, 1.0)
     
     def analyze_sentiment_complexity(self, text: str) -> float:
         """Analyze sentiment analysis difficulty"""
-        text_lower = text.lower()
-        
-        # Count complex sentiment indicators
-        complex_count = sum(1 for indicator in self.complex_sentiment_indicators 
-                          if indicator in text_lower)
-        
-        # Count simple sentiment indicators  
-        simple_count = sum(1 for indicator in self.simple_sentiment_indicators
-                         if indicator in text_lower)
+        return self.score_sentiment(self.extract_features(text, None))
+    
+    def score_sentiment(self, features: ReviewFeatures) -> float:
+        """Sentiment score from extracted features"""
+        complex_count = features.keywords.complex_sentiment
+        simple_count = features.keywords.simple_sentiment
         
         # Multiple sentiment words indicate complexity
         sentiment_word_count = complex_count + simple_count
@@ -149,13 +473,17 @@ class SmartRouterV2:
             base_score = 0.1  # Simple clear sentiment
         else:
             base_score = 0.3  # Neutral/unclear = moderate complexity
-            
+        
         return min(base_score, 1.0)
     
     def analyze_length_complexity(self, text: str) -> float:
         """Analyze complexity based on text length and structure"""
-        word_count = len(text.split())
-        sentence_count = len([s for s in text.split('.') if s.strip()])
+        return self.score_length(self.extract_features(text, None))
+    
+    def score_length(self, features: ReviewFeatures) -> float:
+        """Length score from extracted features"""
+        word_count = features.word_count
+        sentence_count = features.sentence_count
         
         # Length-based complexity
         if word_count < 20:
@@ -168,57 +496,48 @@ class SmartRouterV2:
             length_score = 0.6
         else:
             length_score = 0.8
-            
+        
         # Structure complexity (avg words per sentence)
         if sentence_count > 0:
             avg_sentence_length = word_count / sentence_count
             if avg_sentence_length > 20:
                 length_score += 0.1  # Long sentences = more complex
-                
+        
         return min(length_score, 1.0)
     
     def analyze_domain_complexity(self, text: str, category: str) -> float:
         """Analyze domain-specific complexity requirements"""
-        text_lower = text.lower()
-        
-        domain_multipliers = {
-            'Electronics': 1.2,  # Technical domain = higher baseline
-            'Books': 0.8,        # Content domain = lower baseline  
-            'Home_and_Garden': 1.0  # Practical domain = standard baseline
-        }
-        
-        # Domain-specific complexity indicators
-        complexity_indicators = {
-            'Electronics': [
-                'compatibility', 'installation', 'setup', 'configuration',
-                'troubleshooting', 'issues', 'problems', 'defect', 'malfunction'
-            ],
-            'Books': [
-                'analysis', 'interpretation', 'meaning', 'symbolism', 'metaphor',
-                'academic', 'scholarly', 'research', 'complex', 'difficult'
-            ],
-            'Home_and_Garden': [
-                'installation', 'assembly', 'maintenance', 'repair', 'replacement',
-                'compatibility', 'fit', 'size', 'dimensions', 'measurements'
-            ]
-        }
-        
-        indicators = complexity_indicators.get(category, [])
-        matches = sum(1 for indicator in indicators if indicator in text_lower)
-        
-        base_score = 0.3 * domain_multipliers.get(category, 1.0)
-        complexity_bonus = matches * 0.15
+        return self.score_domain(self.extract_features(text, category))
+    
+    def score_domain(self, features: ReviewFeatures) -> float:
+        """Domain score from extracted features"""
+        base_score = 0.3 * self.domain_multipliers.get(features.category, 1.0)
+        complexity_bonus = features.keywords.domain_matches * 0.15
         
         return min(base_score + complexity_bonus, 1.0)
     
     def calculate_complexity_score(self, text: str, category: str) -> ComplexityScore:
         """Calculate comprehensive complexity score"""
+        cache_key = None
+        if self.routing_cache is not None:
+            cache_key = RoutingCache.make_key(text, category)
+            cached = self.routing_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        score = self.score_features(self.extract_features(text, category))
+        if cache_key is not None:
+            self.routing_cache.put(cache_key, score)
+        return score
+    
+    def score_features(self, features: ReviewFeatures) -> ComplexityScore:
+        """Complexity score and tier from already-extracted features"""
         
         # Individual complexity scores
-        technical = self.analyze_technical_complexity(text, category)
-        sentiment = self.analyze_sentiment_complexity(text) 
-        length = self.analyze_length_complexity(text)
-        domain = self.analyze_domain_complexity(text, category)
+        technical = self.score_technical(features)
+        sentiment = self.score_sentiment(features)
+        length = self.score_length(features)
+        domain = self.score_domain(features)
         
         # Weighted final score
         weights = {
@@ -262,14 +581,62 @@ class SmartRouterV2:
         else:
             return 'premium'           # $3.00/M - 0.1% of reviews
     
+    def select_tier_codes(self, technical: np.ndarray, sentiment: np.ndarray, length: np.ndarray,
+                          domain: np.ndarray, final: np.ndarray, word_counts: np.ndarray,
+                          categories: Sequence[str]) -> np.ndarray:
+        """Batch counterpart of select_optimal_tier (uint8 tier code per row)"""
+        # Tier thresholds are inclusive upper bounds, as in select_optimal_tier
+        thresholds = [self.model_tiers[tier]['complexity_threshold'] for tier in TIER_NAMES[:-1]]
+        return np.searchsorted(thresholds, final, side='left').astype(np.uint8)
+    
+    def select_latency_aware_tier(self, complexity: ComplexityScore) -> str:
+        """Shift a borderline review to a faster neighbouring tier
+        
+        Only reviews within latency_margin of the threshold between two tiers
+        are eligible, only the neighbour across that threshold is considered,
+        a move to a cheaper tier must stay at or above the recommended tier's
+        quality floor, and the neighbour may cost at most latency_cost_ratio x
+        the recommended tier (so by default a faster but pricier tier is never
+        chosen). Without a tracker (or enough latency samples) the complexity
+        recommendation is returned unchanged.
+        """
+        tier = complexity.recommended_tier
+        if self.latency_tracker is None:
+            return tier
+        
+        score = complexity.final_score
+        rank = TIER_NAMES.index(tier)
+        floor_rank = TIER_NAMES.index(self.model_tiers[tier]['quality_floor'])
+        
+        candidate = None
+        upper = self.model_tiers[tier]['complexity_threshold']
+        if rank + 1 < len(TIER_NAMES) and upper - score <= self.latency_margin:
+            candidate = TIER_NAMES[rank + 1]
+        elif rank > 0 and rank - 1 >= floor_rank:
+            lower = self.model_tiers[TIER_NAMES[rank - 1]]['complexity_threshold']
+            if score - lower <= self.latency_margin:
+                candidate = TIER_NAMES[rank - 1]
+        if candidate is None:
+            return tier
+        if self.model_tiers[candidate]['cost_per_million'] > \
+                self.model_tiers[tier]['cost_per_million'] * self.latency_cost_ratio:
+            return tier
+        
+        current_p95 = self.latency_tracker.percentile(tier, 95)
+        candidate_p95 = self.latency_tracker.percentile(candidate, 95)
+        if current_p95 is None or candidate_p95 is None:
+            return tier
+        return candidate if candidate_p95 < current_p95 * self.latency_advantage else tier
+    
     def route_review(self, review_text: str, category: str) -> Dict:
         """Main routing function with detailed analysis"""
         
         complexity = self.calculate_complexity_score(review_text, category)
-        tier_config = self.model_tiers[complexity.recommended_tier]
+        tier = self.select_latency_aware_tier(complexity)
+        tier_config = self.model_tiers[tier]
         
         return {
-            'recommended_tier': complexity.recommended_tier,
+            'recommended_tier': tier,
             'complexity_analysis': {
                 'technical': complexity.technical_score,
                 'sentiment': complexity.sentiment_score, 
@@ -282,21 +649,392 @@ class SmartRouterV2:
             'reasoning': self._generate_routing_reasoning(complexity, category)
         }
     
+    def route_reviews_batch(self, texts, categories: Union[str, Sequence[str]]) -> BatchRoutingResult:
+        """Vectorized routing for many reviews at once
+        
+        Accepts lists, NumPy arrays, pandas Series or Arrow arrays of texts and
+        either one category for all reviews or a matching column. Keyword scans
+        run once per review; scoring and tier selection are NumPy array ops
+        that reproduce calculate_complexity_score/select_optimal_tier exactly.
+        """
+        texts = _to_list(texts)
+        n = len(texts)
+        if isinstance(categories, str):
+            categories = [categories] * n
+        else:
+            categories = _to_list(categories)
+            if len(categories) != n:
+                raise ValueError(f"Got {n} texts but {len(categories)} categories")
+        
+        # Per-review feature extraction (the only Python-level loop)
+        technical_matches = np.zeros(n, dtype=np.int64)
+        complex_counts = np.zeros(n, dtype=np.int64)
+        simple_counts = np.zeros(n, dtype=np.int64)
+        domain_matches = np.zeros(n, dtype=np.int64)
+        word_counts = np.zeros(n, dtype=np.int64)
+        sentence_counts = np.zeros(n, dtype=np.int64)
+        flags = np.zeros((n, 3), dtype=bool)
+        multipliers = np.ones(n, dtype=np.float64)
+        
+        # Cached rows skip extraction; their scores are patched in below
+        cached_rows: Dict[int, ComplexityScore] = {}
+        miss_keys: Dict[int, Tuple[str, bytes]] = {}
+        
+        for i, (text, category) in enumerate(zip(texts, categories)):
+            if self.routing_cache is not None:
+                key = RoutingCache.make_key(text, category)
+                cached = self.routing_cache.get(key)
+                if cached is not None:
+                    cached_rows[i] = cached
+                    word_counts[i] = len(text.split())
+                    continue
+                miss_keys[i] = key
+            
+            features = self.extract_features(text, category)
+            counts = features.keywords
+            technical_matches[i] = counts.technical_matches
+            complex_counts[i] = counts.complex_sentiment
+            simple_counts[i] = counts.simple_sentiment
+            domain_matches[i] = counts.domain_matches
+            flags[i] = (counts.has_specifications, counts.has_comparisons, counts.has_numbers)
+            word_counts[i] = features.word_count
+            sentence_counts[i] = features.sentence_count
+            multipliers[i] = self.domain_multipliers.get(category, 1.0)
+        
+        # Technical: keyword density capped at 0.6 plus spec/comparison/number bonuses
+        safe_words = np.maximum(word_counts, 1)
+        density = (technical_matches / safe_words) * 100
+        bonus = np.zeros(n)
+        bonus += np.where(flags[:, 0], 0.2, 0.0)
+        bonus += np.where(flags[:, 1], 0.1, 0.0)
+        bonus += np.where(flags[:, 2], 0.1, 0.0)
+        technical = np.minimum(np.minimum(density / 10, 0.6) + bonus, 1.0)
+        technical[word_counts == 0] = 0.0
+        
+        # Sentiment: complex indicators dominate, then indicator volume
+        sentiment = np.select(
+            [complex_counts > 0, (complex_counts + simple_counts) > 3, simple_counts > 0],
+            [0.7 + (complex_counts * 0.1), 0.4, 0.1],
+            default=0.3
+        )
+        sentiment = np.minimum(sentiment, 1.0)
+        
+        # Length: word-count buckets plus long-sentence bonus
+        length_buckets = np.array([0.1, 0.2, 0.4, 0.6, 0.8])
+        length = length_buckets[np.searchsorted([20, 50, 100, 200], word_counts, side='right')]
+        long_sentences = np.zeros(n, dtype=bool)
+        has_sentences = sentence_counts > 0
+        long_sentences[has_sentences] = (
+            word_counts[has_sentences] / sentence_counts[has_sentences]
+        ) > 20
+        length = np.minimum(length + np.where(long_sentences, 0.1, 0.0), 1.0)
+        
+        # Domain: category baseline plus indicator bonus
+        domain = np.minimum(0.3 * multipliers + domain_matches * 0.15, 1.0)
+        
+        final = technical * 0.35 + sentiment * 0.25 + length * 0.20 + domain * 0.20
+        
+        tier_codes = self.select_tier_codes(
+            technical, sentiment, length, domain, final, word_counts, categories
+        )
+        
+        for i, score in cached_rows.items():
+            technical[i] = score.technical_score
+            sentiment[i] = score.sentiment_score
+            length[i] = score.length_score
+            domain[i] = score.domain_score
+            final[i] = score.final_score
+            tier_codes[i] = TIER_NAMES.index(score.recommended_tier)
+        
+        for i, key in miss_keys.items():
+            self.routing_cache.put(key, ComplexityScore(
+                technical_score=float(technical[i]),
+                sentiment_score=float(sentiment[i]),
+                length_score=float(length[i]),
+                domain_score=float(domain[i]),
+                final_score=float(final[i]),
+                recommended_tier=TIER_NAMES[tier_codes[i]]
+            ))
+        
+        tier_costs = np.array([self.model_tiers[tier]['cost_per_million'] for tier in TIER_NAMES])
+        
+        return BatchRoutingResult(
+            technical_scores=technical,
+            sentiment_scores=sentiment,
+            length_scores=length,
+            domain_scores=domain,
+            final_scores=final,
+            tier_codes=tier_codes,
+            cost_per_million=tier_costs[tier_codes],
+            word_counts=word_counts
+        )
+    
+    def summarize_batch(self, texts: List[str], categories: List[str], offset: int = 0,
+                        tokens_per_word: float = 1.3, token_counts=None) -> CorpusRoutingSummary:
+        """Route a shard and reduce it to per-tier aggregates
+        
+        Projected cost uses `token_counts` (one per review, e.g. from
+        TokenCounter) when given, otherwise `tokens_per_word` tokens per
+        whitespace word. `offset` is the shard's position in the corpus so
+        merged examples keep global order.
+        """
+        batch = self.route_reviews_batch(texts, categories)
+        summary = CorpusRoutingSummary.empty()
+        summary.total_reviews = len(batch)
+        if not len(batch):
+            return summary
+        
+        tiers = len(TIER_NAMES)
+        if token_counts is not None:
+            review_tokens = np.asarray(token_counts, dtype=np.float64)
+        else:
+            review_tokens = batch.word_counts * tokens_per_word
+        review_costs = (review_tokens / 1_000_000) * batch.cost_per_million
+        summary.tier_counts = np.bincount(batch.tier_codes, minlength=tiers).astype(np.int64)
+        summary.projected_cost = np.bincount(batch.tier_codes, weights=review_costs, minlength=tiers)
+        summary.complexity_sum = np.bincount(batch.tier_codes, weights=batch.final_scores, minlength=tiers)
+        
+        for code in np.unique(batch.tier_codes).tolist():
+            rows = np.flatnonzero(batch.tier_codes == code)[:2].tolist()
+            summary.first_seen[code] = offset + rows[0]
+            summary.examples[code] = [{
+                'index': offset + i,
+                'text': texts[i][:60] + '...',
+                'category': categories[i],
+                'complexity': float(batch.final_scores[i])
+            } for i in rows]
+        return summary
+    
+    def route_corpus(self, texts, categories: Union[str, Sequence[str]], workers: int = 1,
+                     shard_size: Optional[int] = None, tokens_per_word: float = 1.3,
+                     token_counts=None) -> CorpusRoutingSummary:
+        """Route a whole corpus, optionally sharded across worker processes
+        
+        Each worker builds its own router once and returns only per-tier
+        aggregates for its shards, so nothing per-review crosses the process
+        boundary on the way back. `workers=0` uses every available core.
+        """
+        texts = _to_list(texts)
+        if isinstance(categories, str):
+            categories = [categories] * len(texts)
+        else:
+            categories = _to_list(categories)
+        
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        
+        if workers <= 1 or len(texts) < 2:
+            return self.summarize_batch(texts, categories, tokens_per_word=tokens_per_word,
+                                        token_counts=token_counts)
+        
+        # Several shards per worker keeps the pool busy when shards finish unevenly
+        if shard_size is None:
+            shard_size = max(1, math.ceil(len(texts) / (workers * 4)))
+        shards = [
+            (offset, texts[offset:offset + shard_size], categories[offset:offset + shard_size], tokens_per_word,
+             token_counts[offset:offset + shard_size] if token_counts is not None else None)
+            for offset in range(0, len(texts), shard_size)
+        ]
+        
+        summary = CorpusRoutingSummary.empty()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_router,
+                                 initargs=(type(self), self._worker_init_kwargs())) as executor:
+            for shard_summary in executor.map(_route_shard, shards):
+                summary.merge(shard_summary)
+        return summary
+    
+    def _worker_init_kwargs(self) -> Dict:
+        """Constructor arguments for route_corpus worker routers"""
+        return {'cache_size': self.routing_cache.max_size if self.routing_cache is not None else None}
+    
     def _generate_routing_reasoning(self, complexity: ComplexityScore, category: str) -> str:
         """Generate human-readable routing reasoning"""
-        reasons = []
-        
-        if complexity.technical_score > 0.5:
-            reasons.append(f"High technical complexity ({complexity.technical_score:.2f})")
-        if complexity.sentiment_score > 0.6:
-            reasons.append(f"Complex sentiment analysis ({complexity.sentiment_score:.2f})")
-        if complexity.length_score > 0.6:
-            reasons.append(f"Long-form content ({complexity.length_score:.2f})")
-            
-        if not reasons:
-            reasons.append("Simple analysis suitable for lightweight model")
-            
-        return f"{category} review: " + ", ".join(reasons)
+        flags = reasoning_flags(complexity.technical_score, complexity.sentiment_score,
+                                complexity.length_score)
+        return format_routing_reasoning(category, flags, complexity.technical_score,
+                                        complexity.sentiment_score, complexity.length_score)
+
+# Reasoning flag bits, evaluated on full-precision scores
+REASON_TECHNICAL, REASON_SENTIMENT, REASON_LENGTH = 1, 2, 4
+
+def reasoning_flags(technical: float, sentiment: float, length: float) -> int:
+    """Which routing reasons apply to a set of sub-scores"""
+    flags = 0
+    if technical > 0.5:
+        flags |= REASON_TECHNICAL
+    if sentiment > 0.6:
+        flags |= REASON_SENTIMENT
+    if length > 0.6:
+        flags |= REASON_LENGTH
+    return flags
+
+def format_routing_reasoning(category: str, flags: int, technical: float,
+                             sentiment: float, length: float) -> str:
+    """Render routing reasoning from reason flags and sub-scores"""
+    reasons = []
+    
+    if flags & REASON_TECHNICAL:
+        reasons.append(f"High technical complexity ({technical:.2f})")
+    if flags & REASON_SENTIMENT:
+        reasons.append(f"Complex sentiment analysis ({sentiment:.2f})")
+    if flags & REASON_LENGTH:
+        reasons.append(f"Long-form content ({length:.2f})")
+    
+    if not reasons:
+        reasons.append("Simple analysis suitable for lightweight model")
+    
+    return f"{category} review: " + ", ".join(reasons)
+
+class RoutingRecord:
+    """Lightweight view of one RoutingTable row; reasoning is built on access"""
+    __slots__ = ('_table', 'index')
+    
+    def __init__(self, table: 'RoutingTable', index: int):
+        self._table = table
+        self.index = index
+    
+    @property
+    def category(self) -> str:
+        return self._table.categories[self._table.category_codes[self.index]]
+    
+    @property
+    def recommended_tier(self) -> str:
+        return TIER_NAMES[self._table.tier_codes[self.index]]
+    
+    @property
+    def final_score(self) -> float:
+        return self._table.final[self.index]
+    
+    @property
+    def reasoning(self) -> str:
+        table, i = self._table, self.index
+        return format_routing_reasoning(self.category, table.reason_flags[i], table.technical[i],
+                                        table.sentiment[i], table.length[i])
+    
+    def complexity_analysis(self) -> Dict[str, float]:
+        table, i = self._table, self.index
+        return {
+            'technical': table.technical[i],
+            'sentiment': table.sentiment[i],
+            'length': table.length[i],
+            'domain': table.domain[i],
+            'final': table.final[i]
+        }
+
+class RoutingTable:
+    """Append-only struct-of-arrays store of routing decisions for large runs
+    
+    Each row costs 24 bytes: five float32 scores, a uint8 tier code, a uint8
+    reason-flag byte and a uint16 category code. Reason flags are computed
+    from the full-precision scores at append time, so lazily rendered
+    reasoning picks the same reasons as route_review.
+    """
+    
+    def __init__(self):
+        self.technical = array('f')
+        self.sentiment = array('f')
+        self.length = array('f')
+        self.domain = array('f')
+        self.final = array('f')
+        self.tier_codes = array('B')
+        self.reason_flags = array('B')
+        self.category_codes = array('H')
+        self.categories: List[str] = []
+        self._category_index: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.tier_codes)
+    
+    def __getitem__(self, index: int) -> RoutingRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("routing table index out of range")
+        return RoutingRecord(self, index)
+    
+    def _category_code(self, category: str) -> int:
+        code = self._category_index.get(category)
+        if code is None:
+            code = self._category_index[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+    
+    def append(self, score: ComplexityScore, category: str, tier: Optional[str] = None) -> int:
+        """Store one decision and return its row index
+        
+        `tier` is the tier actually chosen when it differs from the score's
+        recommendation (e.g. after select_latency_aware_tier).
+        """
+        self.technical.append(score.technical_score)
+        self.sentiment.append(score.sentiment_score)
+        self.length.append(score.length_score)
+        self.domain.append(score.domain_score)
+        self.final.append(score.final_score)
+        self.tier_codes.append(TIER_NAMES.index(tier or score.recommended_tier))
+        self.reason_flags.append(reasoning_flags(score.technical_score, score.sentiment_score,
+                                                 score.length_score))
+        self.category_codes.append(self._category_code(category))
+        return len(self) - 1
+    
+    def extend_batch(self, batch: BatchRoutingResult, categories: Union[str, Sequence[str]]):
+        """Store every row of a route_reviews_batch result"""
+        if isinstance(categories, str):
+            codes = np.full(len(batch), self._category_code(categories), dtype=np.uint16)
+        else:
+            codes = np.array([self._category_code(c) for c in _to_list(categories)], dtype=np.uint16)
+        
+        flags = (np.where(batch.technical_scores > 0.5, REASON_TECHNICAL, 0)
+                 | np.where(batch.sentiment_scores > 0.6, REASON_SENTIMENT, 0)
+                 | np.where(batch.length_scores > 0.6, REASON_LENGTH, 0))
+        
+        self.technical.frombytes(batch.technical_scores.astype(np.float32).tobytes())
+        self.sentiment.frombytes(batch.sentiment_scores.astype(np.float32).tobytes())
+        self.length.frombytes(batch.length_scores.astype(np.float32).tobytes())
+        self.domain.frombytes(batch.domain_scores.astype(np.float32).tobytes())
+        self.final.frombytes(batch.final_scores.astype(np.float32).tobytes())
+        self.tier_codes.frombytes(batch.tier_codes.astype(np.uint8).tobytes())
+        self.reason_flags.frombytes(flags.astype(np.uint8).tobytes())
+        self.category_codes.frombytes(codes.tobytes())
+    
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """Zero-copy NumPy views of every column"""
+        return {
+            'technical': np.frombuffer(self.technical, dtype=np.float32),
+            'sentiment': np.frombuffer(self.sentiment, dtype=np.float32),
+            'length': np.frombuffer(self.length, dtype=np.float32),
+            'domain': np.frombuffer(self.domain, dtype=np.float32),
+            'final': np.frombuffer(self.final, dtype=np.float32),
+            'tier_codes': np.frombuffer(self.tier_codes, dtype=np.uint8),
+            'reason_flags': np.frombuffer(self.reason_flags, dtype=np.uint8),
+            'category_codes': np.frombuffer(self.category_codes, dtype=np.uint16)
+        }
+    
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers"""
+        columns = (self.technical, self.sentiment, self.length, self.domain, self.final,
+                   self.tier_codes, self.reason_flags, self.category_codes)
+        return sum(column.itemsize * len(column) for column in columns)
+
+# Per-process router for route_corpus workers
+_shard_router: Optional[SmartRouterV2] = None
+
+def _init_shard_router(router_class: type, init_kwargs: Dict):
+    """Build the worker's router once, at pool start-up"""
+    global _shard_router
+    _shard_router = router_class(**init_kwargs)
+
+def _route_shard(shard: Tuple) -> CorpusRoutingSummary:
+    """Worker entry point: aggregate one shard of the corpus"""
+    offset, texts, categories, tokens_per_word, token_counts = shard
+    return _shard_router.summarize_batch(texts, categories, offset, tokens_per_word, token_counts)
+
+def _to_list(column) -> list:
+    """Normalize list, NumPy, pandas or Arrow columns to a Python list"""
+    if hasattr(column, 'to_pylist'):  # pyarrow Array / ChunkedArray
+        return column.to_pylist()
+    if hasattr(column, 'tolist'):     # numpy ndarray / pandas Series
+        return column.tolist()
+    return list(column)
 
 # Example usage and testing
 if __name__ == "__main__":
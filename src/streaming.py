@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Streaming Completions: Early Stop and Time-to-First-Token
+Streams chat completions, stops as soon as the required JSON fields are
+complete, and keeps per-model TTFT and generation speed
+"""
+
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+# A complete JSON value for a field: closed string, number or literal
+_VALUE_PATTERN = r'\s*:\s*(?:"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?=\s*[,}\n])|true|false|null)'
+
+
+class JSONFieldWatcher:
+    """Tracks which required fields have a complete value in partial JSON output"""
+    
+    def __init__(self, required_fields: Sequence[str]):
+        self.pending = {
+            field: re.compile(r'"' + re.escape(field) + r'"' + _VALUE_PATTERN)
+            for field in required_fields
+        }
+        self.end = 0  # Where the last completed field's value ends
+    
+    def complete(self, text: str) -> bool:
+        """True once every required field has a closed value in `text`"""
+        for field, pattern in list(self.pending.items()):
+            match = pattern.search(text)
+            if match:
+                self.end = max(self.end, match.end())
+                del self.pending[field]
+        return not self.pending
+    
+    def close(self, text: str) -> str:
+        """`text` cut after the last required value and closed as a JSON object"""
+        return text[:self.end] + '}'
+
+
+@dataclass
+class StreamResult:
+    """Outcome of one streamed completion"""
+    content: str
+    completion_tokens: int
+    total_tokens: Optional[int]     # Provider usage; None when the stream was cut short
+    time_to_first_token: Optional[float]
+    generation_time: float          # Seconds from first token to last
+    stopped_early: bool
+    
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        if self.generation_time <= 0:
+            return None
+        return self.completion_tokens / self.generation_time
+
+
+async def stream_completion(client, model: str, messages: List[Dict], max_tokens: int,
+                            temperature: float = 0.1, required_fields: Sequence[str] = (),
+                            count_tokens: Callable[[str], int] = len) -> StreamResult:
+    """Stream a chat completion, closing it once `required_fields` are all present
+    
+    Closing the connection stops generation (and billing) on providers that
+    support cancellation. Content cut short this way is closed after the
+    last required field, so it parses as a JSON object holding the required
+    fields (and any that came before them). Without provider usage the completion is counted
+    locally with `count_tokens`.
+    """
+    start = time.monotonic()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    
+    watcher = JSONFieldWatcher(required_fields) if required_fields else None
+    parts: List[str] = []
+    first_token = None
+    last_token = start
+    usage = None
+    stopped_early = False
+    
+    try:
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            
+            last_token = time.monotonic()
+            if first_token is None:
+                first_token = last_token
+            parts.append(chunk.choices[0].delta.content)
+            
+            if watcher is not None and watcher.complete(''.join(parts)):
+                stopped_early = True
+                break
+    finally:
+        await stream.close()
+    
+    content = ''.join(parts)
+    if stopped_early:
+        content = watcher.close(content)
+    completion_tokens = usage.completion_tokens if usage is not None else count_tokens(content)
+    return StreamResult(
+        content=content,
+        completion_tokens=completion_tokens,
+        total_tokens=usage.total_tokens if usage is not None else None,
+        time_to_first_token=first_token - start if first_token is not None else None,
+        generation_time=last_token - first_token if first_token is not None else 0.0,
+        stopped_early=stopped_early
+    )
+
+
+class StreamMetrics:
+    """Rolling per-model time-to-first-token and tokens/sec"""
+    
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.ttft: Dict[str, deque] = {}
+        self.speed: Dict[str, deque] = {}
+        self.requests: Dict[str, int] = {}
+        self.early_stops: Dict[str, int] = {}
+    
+    def record(self, model: str, result: StreamResult):
+        if model not in self.requests:
+            self.ttft[model] = deque(maxlen=self.window)
+            self.speed[model] = deque(maxlen=self.window)
+            self.requests[model] = 0
+            self.early_stops[model] = 0
+        
+        self.requests[model] += 1
+        self.early_stops[model] += result.stopped_early
+        if result.time_to_first_token is not None:
+            self.ttft[model].append(result.time_to_first_token)
+        if result.tokens_per_sec is not None:
+            self.speed[model].append(result.tokens_per_sec)
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        stats = {}
+        for model, requests in self.requests.items():
+            ttft = sorted(self.ttft[model])
+            speed = self.speed[model]
+            stats[model] = {
+                'requests': requests,
+                'early_stops': self.early_stops[model],
+                'ttft_p50': round(ttft[len(ttft) // 2], 3) if ttft else None,
+                'ttft_p95': round(ttft[min(len(ttft) - 1, int(0.95 * len(ttft)))], 3) if ttft else None,
+                'tokens_per_sec': round(sum(speed) / len(speed), 1) if speed else None
+            }
+        return stats
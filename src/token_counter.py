@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Token Counter: Cached, Multi-threaded tiktoken Counting
+Exact token counts for cost projection, using the same encoder as the API call path
+"""
+
+import os
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import tiktoken
+
+
+# Chat-format overhead (OpenAI cookbook, cl100k_base chat models): every message
+# is wrapped as <|start|>{role}<|message|>{content}<|end|>, a `name` costs one
+# extra token, and every reply is primed with <|start|>assistant<|message|>
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+TOKENS_PER_REPLY = 3
+
+_encodings: Dict[str, tiktoken.Encoding] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
+    """Process-wide tiktoken encoding, loaded once per name"""
+    with _encodings_lock:
+        if encoding_name not in _encodings:
+            _encodings[encoding_name] = tiktoken.get_encoding(encoding_name)
+        return _encodings[encoding_name]
+
+
+class TokenCounter:
+    """Per-text token-count cache over a tiktoken encoding
+    
+    Uncached texts are split into slices and encoded on a thread pool; the
+    BPE runs in Rust outside the GIL, so threads scale with cores. Counts are
+    ordinary (no special tokens), matching how review text reaches the prompt.
+    """
+    
+    def __init__(self, encoding: Optional[tiktoken.Encoding] = None,
+                 encoding_name: str = "cl100k_base", max_size: int = 1_000_000,
+                 num_threads: Optional[int] = None, min_parallel: int = 1000):
+        self.encoding = encoding or get_encoding(encoding_name)
+        self.max_size = max_size
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.min_parallel = min_parallel  # Smaller batches are encoded inline
+        self.counts: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def count(self, text: str) -> int:
+        """Token count for one text"""
+        cached = self.counts.get(text)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        tokens = len(self.encoding.encode_ordinary(text))
+        self._store(text, tokens)
+        return tokens
+    
+    def message_tokens(self, message: Dict[str, str]) -> int:
+        """Tokens for one chat message including its format overhead
+        
+        Counts are cached by content, so the unchanged prefix messages of a
+        prompt cost a dict lookup (str hashes are cached on the object) and
+        only new content is encoded.
+        """
+        tokens = TOKENS_PER_MESSAGE + self.count(message['role']) + self.count(message['content'])
+        if message.get('name'):
+            tokens += TOKENS_PER_NAME + self.count(message['name'])
+        return tokens
+    
+    def count_messages(self, messages: Sequence[Dict[str, str]]) -> int:
+        """Prompt tokens billed for a chat completion request"""
+        return sum(self.message_tokens(message) for message in messages) + TOKENS_PER_REPLY
+    
+    def count_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """int64 token count per text, encoding only the texts not cached yet"""
+        counts = np.zeros(len(texts), dtype=np.int64)
+        pending: Dict[str, list] = {}  # Uncached text -> row positions
+        
+        for i, text in enumerate(texts):
+            cached = self.counts.get(text)
+            if cached is not None:
+                counts[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+        
+        # Repeats of an uncached text are encoded once, so they count as hits
+        self.misses += len(pending)
+        self.hits += len(texts) - len(pending)
+        
+        unique = list(pending)
+        for text, tokens in zip(unique, self._encode_lengths(unique)):
+            counts[pending[text]] = tokens
+            self._store(text, tokens)
+        
+        return counts
+    
+    def _encode_lengths(self, texts: List[str]) -> List[int]:
+        """Token count per text, spread over num_threads when the batch is large"""
+        if self.num_threads <= 1 or len(texts) < self.min_parallel:
+            return self._encode_slice(texts)
+        
+        # A few slices per thread keeps the pool busy when slices finish unevenly;
+        # only counts come back, so token lists never pile up in memory
+        step = math.ceil(len(texts) / (self.num_threads * 4))
+        slices = [texts[start:start + step] for start in range(0, len(texts), step)]
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            return [tokens for counted in executor.map(self._encode_slice, slices) for tokens in counted]
+    
+    def _encode_slice(self, texts: List[str]) -> List[int]:
+        encode = self.encoding.encode_ordinary
+        return [len(encode(text)) for text in texts]
+    
+    def _store(self, text: str, tokens: int):
+        # Oldest entries go first once the cache is full
+        if len(self.counts) >= self.max_size:
+            del self.counts[next(iter(self.counts))]
+        self.counts[text] = tokens
+    
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'encoding': self.encoding.name,
+            'size': len(self.counts),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups > 0 else 0.0
+        }
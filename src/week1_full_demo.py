@@ -10,20 +10,37 @@ import time
 import json
 import gc
 import aiohttp
+import numpy as np
 from datetime import datetime
 from dotenv import load_dotenv
+from openai import RateLimitError
 from openrouter_integration import OpenRouterOptimizer
 from cost_reporter import CostTracker
 from main import AmazonDataLoader, SemanticCache
-from smart_router_v2 import SmartRouterV2
+from shared_cache import SharedSemanticCache
+from smart_router_v2 import SmartRouterV2, LatencyTracker, RoutingTable, TIER_NAMES
+from adaptive_concurrency import AdaptiveConcurrencyLimiter
 
 # Load environment variables
 load_dotenv()
 
+# Category system prompts; with REVIEW_INSTRUCTIONS they form the fixed prompt prefix
+CATEGORY_SYSTEM_PROMPTS = {
+    "Electronics": "You are an expert at analyzing electronics product reviews. Focus on technical features, performance, and value.",
+    "Books": "You are an expert at analyzing book reviews. Focus on content quality, readability, and reader satisfaction.",
+    "Home_and_Garden": "You are an expert at analyzing home and garden product reviews. Focus on utility, durability, and practical value."
+}
+REVIEW_INSTRUCTIONS = (
+    "For each review, provide brief analysis as JSON, in this field order:\n"
+    '{"sentiment": "Positive/Negative/Neutral", "quality": "", "recommendation": "", "insight": ""}'
+)
+# Typical answer once early stop closes the stream; its size is the projected completion
+EXPECTED_ANSWER = '{"sentiment": "Positive", "quality": "Good", "recommendation": "Recommend"}'
+
 class Week1FullOptimizer:
     """Enhanced Week 1 optimizer with Smart Router V2 and progress tracking"""
     
-    def __init__(self, max_budget: float = 5.00):
+    def __init__(self, max_budget: float = 5.00, latency_aware: bool = False):
         self.max_budget = max_budget
         os.environ['MAX_BUDGET'] = str(max_budget)
         
@@ -31,39 +48,68 @@ class Week1FullOptimizer:
         self.api_optimizer = OpenRouterOptimizer()
         self.cost_tracker = CostTracker()
         self.data_loader = AmazonDataLoader()
-        self.semantic_cache = SemanticCache(max_size=2000)
-        self.smart_router = SmartRouterV2()  # Enhanced routing with complexity scoring
-        
-        # Conversation contexts for KV cache optimization
-        self.conversation_contexts = {}
+        routing_config = self.api_optimizer.config.get('routing', {})
+        shared_cache = routing_config.get('shared_cache') or {}
+        if shared_cache.get('enabled', False):
+            # One memory-mapped table for every worker on the node
+            self.semantic_cache = SharedSemanticCache(
+                max_size=shared_cache.get('max_size', 16384),
+                similarity_threshold=routing_config.get('cache_similarity_threshold', 0.8),
+                category_thresholds=routing_config.get('cache_similarity_thresholds'),
+                path=shared_cache.get('path', 'data/semantic_cache.mmap')
+            )
+        else:
+            self.semantic_cache = SemanticCache(  # Nearest cached review by embedding similarity
+                max_size=2000,
+                similarity_threshold=routing_config.get('cache_similarity_threshold', 0.8),
+                category_thresholds=routing_config.get('cache_similarity_thresholds')
+            )
+        self.latency_tracker = LatencyTracker()  # Rolling p50/p95 per model tier
+        self.smart_router = SmartRouterV2(  # Complexity scoring + routing-decision cache
+            cache_size=10000,
+            latency_tracker=self.latency_tracker if latency_aware else None
+        )
+        self.api_optimizer.latency_tracker = self.latency_tracker
+        self.routing_table = RoutingTable()  # Compact per-review routing decisions
+        self.token_counter = self.api_optimizer.token_counter  # Cached cl100k_base counts, shared with API calls
+        self.deduplicator = self.api_optimizer._create_deduplicator()  # Near-duplicates reuse one analysis
+        
+        # Per-call outcomes (tier, latency, usable answer) for learned router training
+        self.routing_outcomes = []
+        
+        # Stable per-category prompt prefixes for provider-side prefix (KV) caching
+        self.context_manager = self.api_optimizer._create_context_manager(
+            "You are an expert product review analyst.\n\n" + REVIEW_INSTRUCTIONS,
+            system_prompts={
+                category: prompt + "\n\n" + REVIEW_INSTRUCTIONS
+                for category, prompt in CATEGORY_SYSTEM_PROMPTS.items()
+            }
+        )
         
         # Timeout and concurrency settings
         self.timeout_settings = {
             'per_review': 30.0,
             'per_batch': None,  # Calculated dynamically
             'retry_attempts': 3,
-            'semaphore_limit': 5
+            'initial_concurrency': 5,
+            'max_concurrency': 50,
+            'latency_target_p95': 10.0  # Seconds before concurrency backs off
         }
         
+        # AIMD in-flight limit on API calls: grows while healthy, halves on 429s/timeouts/slow p95
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=self.timeout_settings['initial_concurrency'],
+            max_limit=self.timeout_settings['max_concurrency'],
+            latency_target=self.timeout_settings['latency_target_p95']
+        )
+        self.api_optimizer.concurrency_limiter = self.concurrency_limiter
+        
         print(f"✅ Week 1 Full Optimizer initialized (Budget: ${max_budget})")
         print(f"   • Timeout Protection: {self.timeout_settings['per_review']}s per review")
-        print(f"   • Concurrent Processing: {self.timeout_settings['semaphore_limit']} simultaneous requests")
+        print(f"   • Adaptive Concurrency: {self.timeout_settings['initial_concurrency']}-{self.timeout_settings['max_concurrency']} simultaneous requests (AIMD)")
         print(f"   • Retry Logic: {self.timeout_settings['retry_attempts']} attempts with exponential backoff")
-    
-    def _get_conversation_context(self, category: str) -> list:
-        """Get or create conversation context for KV cache optimization"""
-        if category not in self.conversation_contexts:
-            system_prompts = {
-                "Electronics": "You are an expert at analyzing electronics product reviews. Focus on technical features, performance, and value.",
-                "Books": "You are an expert at analyzing book reviews. Focus on content quality, readability, and reader satisfaction.", 
-                "Home_and_Garden": "You are an expert at analyzing home and garden product reviews. Focus on utility, durability, and practical value."
-            }
-            
-            self.conversation_contexts[category] = [
-                {"role": "system", "content": system_prompts.get(category, "You are an expert product review analyst.")}
-            ]
-        
-        return self.conversation_contexts[category]
+        if latency_aware:
+            print(f"   • Latency-Aware Routing: borderline reviews may shift to a faster tier")
     
     async def analyze_review_with_full_optimization(self, review: dict) -> dict:
         """Analyze single review with all optimizations"""
@@ -99,65 +145,41 @@ class Week1FullOptimizer:
             }
         
         # Layer 2: Enhanced Smart Routing V2 + KV Cache Optimization
-        routing_result = self.smart_router.route_review(review_text, category)
-        model_tier = routing_result['recommended_tier']
-        complexity_score = routing_result['complexity_analysis']['final']
-        
-        # Prepare conversation context for KV cache optimization
-        conversation_context = self._get_conversation_context(category)
-        
-        # Create optimized prompt with context
-        user_prompt = f"""Analyze this {category.lower()} review:
-
-Product: {review.get('product_title', 'Product')}
-Rating: {review.get('rating', 'N/A')}/5
-Review: "{review_text}"
-
-Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessment, and key insight."""
+        complexity = self.smart_router.calculate_complexity_score(review_text, category)
+        model_tier = self.smart_router.select_latency_aware_tier(complexity)
+        routing_row = self.routing_table.append(complexity, category, model_tier)
+        complexity_score = complexity.final_score
         
-        # Use conversation context (KV cache optimization)
-        messages = conversation_context + [{"role": "user", "content": user_prompt}]
+        # Only the review varies; instructions live in the cached category prefix
+        messages, kv_cache_benefit = self.context_manager.build_messages(category, self._user_prompt(review))
         
         try:
-            # Make API call with conversation context
+            # Make API call with the shared prefix
             model_config = self.api_optimizer._get_model_config(model_tier)
             model_name = model_config['openrouter_name']
             
-            response = await asyncio.to_thread(
-                self.api_optimizer.client.chat.completions.create,
-                model=model_name,
-                messages=messages,
-                max_tokens=100,
-                temperature=0.1
-            )
+            # Response cache, then this tier's RPM/TPM buckets, then a streamed call
+            # that stops once sentiment, quality and recommendation are in
+            prompt_tokens = self.token_counter.count_messages(messages)
+            completion = await self.api_optimizer._complete(model_tier, messages, 100, prompt_tokens,
+                                                              early_stop=True)
+            api_latency = completion['latency']
             
-            # Calculate costs
-            tokens_used = response.usage.total_tokens if response.usage else 100
+            # Calculate costs (a response cache hit is free)
+            tokens_used = completion['tokens_used']
             cost_per_million = model_config['cost_per_million_tokens']
             actual_cost = (tokens_used / 1_000_000) * cost_per_million
             
-            # Update conversation context for next KV cache optimization
-            assistant_response = response.choices[0].message.content
-            conversation_context.extend([
-                {"role": "user", "content": user_prompt},
-                {"role": "assistant", "content": assistant_response}
-            ])
-            
-            # Trim context if too long (memory management)
-            if len(conversation_context) > 15:
-                conversation_context[:] = [conversation_context[0]] + conversation_context[-14:]
-                # Force garbage collection to prevent memory leaks
-                gc.collect()
+            assistant_response = completion['content'] or ''
             
             # Track cost
-            kv_cache_benefit = len(conversation_context) > 3  # Context reused
             self.cost_tracker.log_api_call(
                 model=model_name,
                 tokens_input=tokens_used // 2,
                 tokens_output=tokens_used // 2,
                 cost_usd=actual_cost,
                 category=category,
-                cache_hit=False,
+                cache_hit=completion['cached'] or completion['coalesced'],
                 processing_time=time.time() - start_time
             )
             
@@ -172,6 +194,16 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             elif 'negative' in response_lower:
                 sentiment = 'Negative'
             
+            # Outcome record for learned router training (cached/shared answers carry no latency)
+            if not completion['cached'] and not completion['coalesced']:
+                self.routing_outcomes.append({
+                    'review_text': review_text,
+                    'category': category,
+                    'tier': model_tier,
+                    'acceptable': any(label in response_lower for label in ('positive', 'negative', 'neutral')),
+                    'latency': round(api_latency, 4)
+                })
+            
             # Create result for semantic caching
             from main import ProductReviewResult
             cache_result = ProductReviewResult(
@@ -197,18 +229,34 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
                 'cost': actual_cost,
                 'processing_time': time.time() - start_time,
                 'semantic_cache_hit': False,
+                'response_cache_hit': completion['cached'],
+                'coalesced': completion['coalesced'],  # Shared an identical in-flight API call
                 'kv_cache_hit': kv_cache_benefit,
                 'tokens_used': tokens_used,
+                'time_to_first_token': completion['time_to_first_token'],
+                'tokens_per_sec': completion['tokens_per_sec'],
+                'stopped_early': completion['stopped_early'],
                 'response_preview': assistant_response[:100],
                 'complexity_score': complexity_score,
                 'routing_tier': model_tier,
-                'routing_reasoning': routing_result['reasoning']
+                'routing_row': routing_row,  # Reasoning rendered lazily from routing_table
+                'projected_tokens': prompt_tokens + self.token_counter.count(EXPECTED_ANSWER)
             }
-            
+        
+        except RateLimitError:
+            raise  # Let the retry loop back off and signal the concurrency limiter
         except Exception as e:
             print(f"❌ API call failed: {e}")
             return None
     
+    @staticmethod
+    def _user_prompt(review: dict) -> str:
+        return (
+            f"Product: {review.get('product_title', 'Product')}\n"
+            f"Rating: {review.get('rating', 'N/A')}/5\n"
+            f"Review: \"{review['review_text']}\""
+        )
+    
     async def _process_review_with_timeout_protection(self, review: dict) -> dict:
         """Process single review with timeout protection and retry logic"""
         for attempt in range(self.timeout_settings['retry_attempts']):
@@ -219,6 +267,8 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
                 )
                 return result
             except asyncio.TimeoutError:
+                # A timeout during the API call already cut the limit in _complete;
+                # one spent queueing for a slot says nothing about the server
                 if attempt == self.timeout_settings['retry_attempts'] - 1:  # Last attempt
                     print(f"⚠️ Review timed out after {self.timeout_settings['retry_attempts']} attempts")
                     return None
@@ -230,16 +280,14 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
                 await asyncio.sleep(1)
         return None
     
-    async def _process_batch_concurrent(self, reviews: list) -> list:
-        """Process batch with concurrent processing and timeout protection"""
-        semaphore = asyncio.Semaphore(self.timeout_settings['semaphore_limit'])
-        
-        async def process_with_semaphore(review):
-            async with semaphore:
-                return await self._process_review_with_timeout_protection(review)
+    async def _process_batch_concurrent(self, reviews: list, aligned: bool = False) -> list:
+        """Process batch with concurrent processing and timeout protection
         
-        # Create tasks for concurrent processing
-        tasks = [process_with_semaphore(review) for review in reviews]
+        With `aligned`, results keep the input order and failed reviews are
+        None instead of being dropped.
+        """
+        # Create tasks for concurrent processing; the AIMD limit applies to the API calls inside
+        tasks = [self._process_review_with_timeout_protection(review) for review in reviews]
         
         # Calculate dynamic batch timeout
         batch_timeout = len(reviews) * (self.timeout_settings['per_review'] + 5.0)
@@ -252,18 +300,83 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             
             # Filter successful results
             successful_results = [
-                result for result in results 
-                if result is not None and not isinstance(result, Exception)
+                None if isinstance(result, Exception) else result
+                for result in results
             ]
             
             # Force garbage collection after each batch
             gc.collect()
             
-            return successful_results
-            
+            if aligned:
+                return successful_results
+            return [result for result in successful_results if result is not None]
+        
         except asyncio.TimeoutError:
             print(f"❌ Entire batch timed out after {batch_timeout:.0f}s")
-            return []
+            return [None] * len(reviews) if aligned else []
+    
+    async def _process_batch_deduplicated(self, reviews: list) -> list:
+        """Route and analyze one representative per near-duplicate cluster, then fan out
+        
+        Duplicates of a representative seen in this or an earlier batch get
+        a free copy of its result with provenance (`duplicate_of`). If the
+        representative failed, its duplicates are analyzed on their own.
+        """
+        if self.deduplicator is None:
+            return await self._process_batch_concurrent(reviews)
+        
+        # Keyed by batch position: review_id is the product ASIN and repeats across reviews
+        representatives = []
+        duplicates = []
+        for review in reviews:
+            key, match = self.deduplicator.add(review['review_text'], review['category'])
+            if match is None:
+                representatives.append((review, key))
+            else:
+                duplicates.append((review, match))
+        
+        outcomes = await self._process_batch_concurrent([review for review, _ in representatives], aligned=True)
+        results = []
+        for (_, key), result in zip(representatives, outcomes):
+            if result is not None:
+                self.deduplicator.attach(key, result)
+                results.append(result)
+        
+        orphans = []
+        for review, match in duplicates:
+            source = self.deduplicator.payload(match.representative)
+            if source is None:
+                orphans.append(review)
+                continue
+            self.cost_tracker.log_api_call(
+                model='near_duplicate',
+                tokens_input=0,
+                tokens_output=0,
+                cost_usd=0.0,
+                category=review['category'],
+                cache_hit=True,
+                processing_time=0.0
+            )
+            results.append({
+                **source,
+                'review_id': review.get('review_id', 'unknown'),
+                'cost': 0.0,
+                'processing_time': 0.0,
+                'semantic_cache_hit': False,
+                'response_cache_hit': False,
+                'coalesced': False,
+                'kv_cache_hit': False,
+                'tokens_used': 0,
+                'time_to_first_token': None,
+                'tokens_per_sec': None,
+                'stopped_early': False,
+                'projected_tokens': 0,
+                'duplicate_of': source['review_id'],
+                'duplicate_similarity': round(match.similarity, 3)
+            })
+        if orphans:
+            results.extend(await self._process_batch_concurrent(orphans))
+        return results
     
     async def _load_with_progress_tracking(self, category: str, sample_size: int, current_total: int, target_total: int) -> list:
         """Load data with smooth progress tracking for 1000-review target"""
@@ -291,7 +404,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
                     print(f"📊 Progress: {total_so_far}/{target_total} reviews loaded ({percentage:.1f}%)", flush=True)
             
             return progress_reviews
-            
+        
         except Exception as e:
             print(f"⚠️ Streaming failed for {category}: {e}", flush=True)
             return self.data_loader.load_sample_data(category, sample_size=sample_size)
@@ -305,7 +418,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
         print(f"\n🚀 Processing {total_reviews} Reviews with Enterprise Progress Tracking")
         print(f"📊 Progress will be shown every 50 reviews until 100% completion")
         print(f"=" * 70)
-        print(f"🔄 Concurrent Processing: {self.timeout_settings['semaphore_limit']} simultaneous requests")
+        print(f"🔄 Adaptive Concurrency: starting at {self.concurrency_limiter.current_limit} simultaneous requests")
         print(f"🛡️ Timeout Protection: {self.timeout_settings['per_review']}s per review with retry logic")
         print(f"⚡ Processing {total_reviews} reviews in {total_batches} optimized batches...")
         
@@ -317,7 +430,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             batch_start = time.time()
             
             # Process batch with concurrent processing and timeout protection
-            batch_results = await self._process_batch_concurrent(batch)
+            batch_results = await self._process_batch_deduplicated(batch)
             
             batch_time = time.time() - batch_start
             results.extend(batch_results)
@@ -347,7 +460,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             if total_processed % 50 == 0 or total_processed == total_reviews or batch_num % 3 == 0:
                 print(f"📊 Processing Progress: {total_processed}/{total_reviews} reviews ({overall_progress:.1f}%)", flush=True)
                 if total_processed % 100 == 0 or total_processed == total_reviews:
-                    print(f"⚡ Performance: {reviews_per_second:.2f} rev/s | Success Rate: {success_rate:.0f}% | Cost: ${batch_cost:.6f}", flush=True)
+                    print(f"⚡ Performance: {reviews_per_second:.2f} rev/s | Success Rate: {success_rate:.0f}% | Cost: ${batch_cost:.6f} | Concurrency: {self.concurrency_limiter.current_limit}", flush=True)
             
             # Compact batch summary (only every few batches for clean output)
             if batch_num % 5 == 0 or batch_num == total_batches:
@@ -368,46 +481,47 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
         
         return results
     
-    def analyze_routing_distribution(self, reviews: list) -> dict:
-        """Analyze projected routing distribution before processing"""
+    def analyze_routing_distribution(self, reviews: list, workers: int = 1) -> dict:
+        """Analyze projected routing distribution before processing
+        
+        `workers > 1` shards the corpus across processes (0 = all cores);
+        the report is the same either way.
+        """
         distribution = {}
-        total_projected_cost = 0
         
         print(f"\n🧠 SMART ROUTING V2 ANALYSIS:")
         print(f"=" * 40)
         
-        for review in reviews:
-            routing_result = self.smart_router.route_review(
-                review['review_text'], 
-                review['category']
-            )
-            
-            tier = routing_result['recommended_tier']
-            if tier not in distribution:
-                distribution[tier] = {
-                    'count': 0,
-                    'cost_per_million': routing_result['cost_per_million'],
-                    'projected_cost': 0,
-                    'avg_complexity': 0,
-                    'examples': []
-                }
-            
-            # Calculate projected cost for this review
-            estimated_tokens = len(review['review_text'].split()) * 1.3
-            review_cost = (estimated_tokens / 1_000_000) * routing_result['cost_per_million']
-            
-            distribution[tier]['count'] += 1
-            distribution[tier]['projected_cost'] += review_cost
-            distribution[tier]['avg_complexity'] += routing_result['complexity_analysis']['final']
-            total_projected_cost += review_cost
-            
-            # Store examples
-            if len(distribution[tier]['examples']) < 2:
-                distribution[tier]['examples'].append({
-                    'text': review['review_text'][:60] + '...',
-                    'category': review['category'],
-                    'complexity': routing_result['complexity_analysis']['final']
-                })
+        # Billed tokens per review: the real prompt (prefix + review turn) plus the answer;
+        # review turns are batch-encoded across threads, prefixes counted once per category
+        texts = [review['review_text'] for review in reviews]
+        categories = [review['category'] for review in reviews]
+        token_counts = self.context_manager.project_prompt_tokens(
+            categories, [self._user_prompt(review) for review in reviews]
+        ) + self.token_counter.count(EXPECTED_ANSWER)
+        
+        # Score the whole corpus into per-tier aggregates
+        summary = self.smart_router.route_corpus(
+            texts,
+            categories,
+            workers=workers,
+            token_counts=token_counts
+        )
+        total_projected_cost = summary.total_projected_cost
+        
+        # Tiers listed in order of first appearance
+        for code in summary.tiers_in_order():
+            tier = TIER_NAMES[code]
+            distribution[tier] = {
+                'count': int(summary.tier_counts[code]),
+                'cost_per_million': self.smart_router.model_tiers[tier]['cost_per_million'],
+                'projected_cost': float(summary.projected_cost[code]),
+                'avg_complexity': float(summary.complexity_sum[code]),
+                'examples': [
+                    {key: example[key] for key in ('text', 'category', 'complexity')}
+                    for example in summary.examples[code]
+                ]
+            }
         
         # Calculate averages and display
         for tier, data in distribution.items():
@@ -424,6 +538,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
         savings_percentage = ((baseline_cost - total_projected_cost) / baseline_cost * 100)
         
         print(f"\n💰 PROJECTED OPTIMIZATION:")
+        print(f"Projected Tokens: {int(token_counts.sum()):,} ({self.token_counter.encoding.name})")
         print(f"Smart Routing: ${total_projected_cost:.6f}")
         print(f"GPT-4o Baseline: ${baseline_cost:.6f}")
         print(f"Projected Savings: {savings_percentage:.1f}%")
@@ -431,6 +546,7 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
         return {
             'distribution': distribution,
             'total_projected_cost': total_projected_cost,
+            'projected_tokens': int(token_counts.sum()),
             'baseline_cost': baseline_cost,
             'projected_savings_percentage': savings_percentage
         }
@@ -445,7 +561,12 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
         total_cost = sum(r['cost'] for r in results)
         semantic_hits = len([r for r in results if r['semantic_cache_hit']])
         kv_hits = len([r for r in results if r['kv_cache_hit']])
-        api_calls = len([r for r in results if not r['semantic_cache_hit']])
+        near_duplicates = len([r for r in results if 'duplicate_of' in r])
+        coalesced = len([r for r in results if r.get('coalesced')])
+        api_calls = len([
+            r for r in results
+            if not r['semantic_cache_hit'] and 'duplicate_of' not in r and not r.get('coalesced')
+        ])
         
         cache_hit_rate = (semantic_hits / total_reviews * 100) if total_reviews > 0 else 0
         kv_hit_rate = (kv_hits / api_calls * 100) if api_calls > 0 else 0
@@ -467,6 +588,16 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             if result['semantic_cache_hit']:
                 category_stats[cat]['semantic_hits'] += 1
         
+        # Projection accuracy: prompt + expected answer tokens projected vs tokens billed
+        projected_tokens = sum(r.get('projected_tokens', 0) for r in results if not r['semantic_cache_hit'])
+        actual_tokens = sum(r['tokens_used'] for r in results if not r['semantic_cache_hit'])
+        token_projection = {
+            'projected_tokens': projected_tokens,
+            'actual_tokens': actual_tokens,
+            'accuracy_percentage': (projected_tokens / actual_tokens * 100) if actual_tokens > 0 else 0,
+            'overhead_per_call': ((actual_tokens - projected_tokens) / api_calls) if api_calls > 0 else 0
+        }
+        
         # Baseline comparison
         baseline_cost = total_reviews * 150 * (10.00 / 1_000_000)  # GPT-4 Turbo baseline
         savings = baseline_cost - total_cost
@@ -478,6 +609,8 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             'total_cost': total_cost,
             'avg_cost_per_review': total_cost / total_reviews if total_reviews > 0 else 0,
             'api_calls': api_calls,
+            'near_duplicates': near_duplicates,
+            'coalesced_requests': coalesced,
             'semantic_cache_hit_rate': cache_hit_rate,
             'kv_cache_hit_rate': kv_hit_rate,
             'model_distribution': model_counts,
@@ -485,7 +618,18 @@ Provide brief analysis: sentiment (Positive/Negative/Neutral), quality assessmen
             'baseline_cost': baseline_cost,
             'savings_amount': savings,
             'savings_percentage': savings_percentage,
-            'budget_used': (total_cost / self.max_budget * 100) if self.max_budget > 0 else 0
+            'budget_used': (total_cost / self.max_budget * 100) if self.max_budget > 0 else 0,
+            'routing_cache': self.smart_router.routing_cache.get_stats(),
+            'semantic_cache': self.semantic_cache.get_stats(),
+            'deduplication': self.deduplicator.get_stats() if self.deduplicator else None,
+            'singleflight': self.api_optimizer.singleflight.get_stats(),
+            'tier_latency': self.latency_tracker.get_stats(),
+            'rate_limits': self.api_optimizer.rate_limiter.get_stats(),
+            'concurrency': self.concurrency_limiter.get_stats(),
+            'streaming': self.api_optimizer.stream_metrics.get_stats(),
+            'response_cache': self.api_optimizer.response_cache.get_stats() if self.api_optimizer.response_cache else None,
+            'prompt_context': self.context_manager.get_stats(),
+            'token_projection': token_projection
         }
 
 async def run_week1_full_demo():
@@ -531,7 +675,7 @@ async def run_week1_full_demo():
             category_time = time.time() - category_start
             overall_progress = (len(all_reviews) / target_total) * 100
             print(f"✅ {category} complete: {len(reviews)} reviews in {category_time:.1f}s | Overall: {overall_progress:.1f}%", flush=True)
-            
+        
         except Exception as e:
             print(f"🔄 Using fallback loading for {category}...", flush=True)
             reviews = optimizer.data_loader.load_sample_data(category, sample_size=reviews_per_category)
@@ -558,7 +702,10 @@ async def run_week1_full_demo():
     print(f"\n🔄 Starting Week 1 processing at {datetime.now().strftime('%H:%M:%S')}...")
     print(f"⏱️ Estimated time: {len(week1_reviews) * 0.3:.0f} seconds based on routing complexity")
     
-    results = await optimizer.process_week1_batch(week1_reviews, batch_size=25)
+    try:
+        results = await optimizer.process_week1_batch(week1_reviews, batch_size=25)
+    finally:
+        await optimizer.api_optimizer.aclose()
     
     total_time = time.time() - start_time
     print(f"\n✅ Week 1 processing completed in {total_time:.1f} seconds!")
@@ -579,14 +726,62 @@ async def run_week1_full_demo():
     print(f"Actual Cost: ${report['total_cost']:.6f}")
     actual_vs_projected = ((report['total_cost'] - routing_analysis['total_projected_cost']) / routing_analysis['total_projected_cost'] * 100)
     print(f"Routing Accuracy: {actual_vs_projected:+.1f}% vs projection")
+    token_projection = report['token_projection']
+    print(f"Token Projection: {token_projection['projected_tokens']:,} projected vs "
+          f"{token_projection['actual_tokens']:,} billed ({token_projection['accuracy_percentage']:.1f}%)")
+    print(f"  Unprojected: {token_projection['overhead_per_call']:.0f} tokens per call")
     
     print(f"\n🎯 OPTIMIZATION RESULTS:")
     print(f"Semantic Cache Hit Rate: {report['semantic_cache_hit_rate']:.1f}%")
+    semantic_cache = report['semantic_cache']
+    if 'policy' in semantic_cache:
+        print(f"  {semantic_cache['size']:,} entries, {semantic_cache['evictions']:,} evicted "
+              f"({semantic_cache['policy']['rejected']:,} one-off reviews refused admission)")
+    else:
+        print(f"  {semantic_cache['size']:,} entries shared across workers ({semantic_cache['path']}), "
+              f"{semantic_cache['evictions']:,} evicted by this worker")
     print(f"KV Cache Benefit Rate: {report['kv_cache_hit_rate']:.1f}%")
+    prompt_context = report['prompt_context']
+    print(f"  Reused prefix: {prompt_context['reused_token_share']:.1f}% of prompt tokens "
+          f"(avg {prompt_context['avg_prompt_tokens']:.0f} tokens/prompt, {prompt_context['truncated']} truncated)")
+    print(f"Routing Cache Hit Rate: {report['routing_cache']['hit_rate']:.1f}%")
+    if report['response_cache']:
+        response_cache = report['response_cache']
+        print(f"Response Cache (on disk): {response_cache['hits']:,} hits ({response_cache['hit_rate']:.1f}%), "
+              f"{response_cache['tokens_saved']:,} tokens saved, {response_cache['entries']:,} entries")
+    if report['deduplication']:
+        deduplication = report['deduplication']
+        print(f"Near-Duplicates Collapsed: {report['near_duplicates']:,} reviews "
+              f"({deduplication['duplicate_rate']:.1f}% of {deduplication['seen']:,} seen, "
+              f"{deduplication['representatives']:,} representatives kept)")
+    if report['coalesced_requests']:
+        print(f"Coalesced In-Flight Duplicates: {report['coalesced_requests']:,} reviews shared a concurrent call")
     print(f"API Calls Made: {report['api_calls']:,}")
     print(f"Baseline Cost (GPT-4): ${report['baseline_cost']:.6f}")
     print(f"Savings: ${report['savings_amount']:.6f} ({report['savings_percentage']:.1f}%)")
     
+    print(f"\n⏱️ TIER LATENCY (p50/p95):")
+    for tier, stats in report['tier_latency'].items():
+        print(f"  {tier}: {stats['p50']:.2f}s / {stats['p95']:.2f}s ({stats['samples']} samples)")
+    
+    if report['streaming']:
+        print(f"\n📡 STREAMING (TTFT p50/p95, generation speed):")
+        for model, stats in report['streaming'].items():
+            ttft = f"{stats['ttft_p50']:.2f}s / {stats['ttft_p95']:.2f}s" if stats['ttft_p50'] is not None else "n/a"
+            speed = f"{stats['tokens_per_sec']:.0f} tokens/sec" if stats['tokens_per_sec'] is not None else "n/a"
+            print(f"  {model}: {ttft}, {speed}, {stats['early_stops']}/{stats['requests']} stopped early")
+    
+    concurrency = report['concurrency']
+    print(f"\n🔀 ADAPTIVE CONCURRENCY:")
+    print(f"  Final limit: {concurrency['current_limit']} (range {concurrency['min_limit']}-{concurrency['max_limit']})")
+    print(f"  Adjustments: +{concurrency['increases']} / -{concurrency['decreases']} | Error rate: {concurrency['error_rate']:.1f}%")
+    
+    throttled = {tier: stats for tier, stats in report['rate_limits'].items() if stats['waits']}
+    if throttled:
+        print(f"\n🚦 RATE LIMIT WAITS:")
+        for tier, stats in throttled.items():
+            print(f"  {tier}: {stats['waits']} waits, {stats['wait_seconds']:.1f}s total")
+    
     print(f"\n🤖 MODEL DISTRIBUTION:")
     for model, count in report['model_distribution'].items():
         percentage = (count / report['total_reviews']) * 100
@@ -604,6 +799,13 @@ async def run_week1_full_demo():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     results_file = f"week1_results_{timestamp}.json"
     
+    # Routing reasoning is only rendered for the results we keep
+    detailed_results = [
+        dict(r, routing_reasoning=optimizer.routing_table[r['routing_row']].reasoning)
+        if 'routing_row' in r else r
+        for r in results[:10]
+    ]
+    
     with open(results_file, 'w') as f:
         json.dump({
             'metadata': {
@@ -613,10 +815,17 @@ async def run_week1_full_demo():
             },
             'summary': report,
             'linkedin_summary': linkedin_summary,
-            'detailed_results': results[:10]  # First 10 for space
+            'detailed_results': detailed_results  # First 10 for space
         }, f, indent=2)
     
+    # Routing outcomes feed `python learned_router.py <file>`
+    outcomes_file = f"routing_outcomes_{timestamp}.jsonl"
+    with open(outcomes_file, 'w') as f:
+        for outcome in optimizer.routing_outcomes:
+            f.write(json.dumps(outcome) + "\n")
+    
     print(f"\n📄 Detailed results saved: {results_file}")
+    print(f"📄 Routing outcomes saved: {outcomes_file}")
     print(f"\n📝 LinkedIn Summary:")
     print("=" * 50)
     print(linkedin_summary)
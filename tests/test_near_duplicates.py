@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from near_duplicates import NearDuplicateIndex
+
+REVIEW = ("Sturdy blender, crushes ice in seconds and cleans up quickly. After three months "
+          "of daily smoothies I would recommend it to anyone with a small kitchen.")
+
+
+def test_negated_review_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    key, match = index.add(REVIEW, "Home_and_Garden")
+    assert match is None
+    
+    negated_key, negated_match = index.add(REVIEW.replace("would recommend", "would not recommend"),
+                                           "Home_and_Garden")
+    assert negated_match is None
+    assert negated_key != key
+    assert index.get_stats()['polarity_mismatches'] == 1
+
+
+def test_same_polarity_rewrite_is_a_duplicate():
+    index = NearDuplicateIndex()
+    key, _ = index.add(REVIEW, "Home_and_Garden")
+    
+    _, match = index.add(REVIEW.replace("three months", "four months"), "Home_and_Garden")
+    assert match is not None
+    assert match.representative == key